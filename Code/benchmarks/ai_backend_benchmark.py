@@ -0,0 +1,110 @@
+"""
+AI Backend Benchmark
+Drives AI.get_ai_response at a target concurrency against the local AI
+stand-in (or the mock backend) and reports latency percentiles and throughput.
+
+Every request uses a distinct prompt, so the response cache and single-flight
+coalescing stay out of the way and each call goes through the scheduler.
+
+Usage (from the Code directory):
+    python benchmarks/ai_backend_benchmark.py [--backend botcahx|openai|mock]
+        [--requests 500] [--concurrency 32] [--slots 4]
+        [--latency-ms 200] [--jitter-ms 50] [--error-rate 0] [--reply-chars 400]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import commands.ai as ai_module
+from ai_stand_in import BOTCAHX_PATH, StandInSettings, start_stand_in
+from commands.ai import AI
+from utils.ai_backends import BotcahxBackend, MockBackend, OpenAICompatibleBackend
+
+HOST, PORT = "127.0.0.1", 8797
+SHED_PREFIX = "⏳"
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latency/throughput of get_ai_response")
+    parser.add_argument("--backend", choices=("botcahx", "openai", "mock"), default="botcahx")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32, help="callers in flight at once")
+    parser.add_argument("--slots", type=int, default=ai_module.AI_MAX_CONCURRENT_REQUESTS,
+                        help="scheduler concurrency cap (AI_MAX_CONCURRENT_REQUESTS)")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-chars", type=int, default=400)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    settings = StandInSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.reply_chars)
+    runner = await start_stand_in(settings, HOST, PORT)
+
+    ai_module.AI_CONVERSATION_DB = None
+    cog = AI(None)
+    cog.session = AI.create_session()
+    cog.scheduler.max_concurrency = args.slots
+    cog.scheduler.max_queue = max(args.requests, cog.scheduler.max_queue)
+    if args.backend == "botcahx":
+        cog.backend = BotcahxBackend(f"http://{HOST}:{PORT}{BOTCAHX_PATH}", "benchmark", transport="post")
+    elif args.backend == "openai":
+        cog.backend = OpenAICompatibleBackend(f"http://{HOST}:{PORT}/v1", "benchmark", "stand-in")
+    else:
+        cog.backend = MockBackend(args.latency_ms / 1000, args.error_rate, settings.reply())
+
+    latencies = []
+    outcomes = {"ok": 0, "failed": 0, "shed": 0}
+    counter = iter(range(args.requests))
+
+    async def worker(worker_id):
+        for i in counter:
+            start = time.perf_counter()
+            result = await cog.get_ai_response(
+                f"pertanyaan nomor {i}: rinko suka lagu apa?",
+                guild_id=i % 8, requester_id=worker_id
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            if isinstance(result, dict):
+                outcomes["ok"] += 1
+            elif isinstance(result, str) and result.startswith(SHED_PREFIX):
+                outcomes["shed"] += 1
+            else:
+                outcomes["failed"] += 1
+
+    print(f"backend={args.backend} requests={args.requests} concurrency={args.concurrency} "
+          f"slots={args.slots} latency={args.latency_ms}±{args.jitter_ms} ms "
+          f"error_rate={args.error_rate} reply={args.reply_chars} chars\n")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    wait = ai_module.metrics.summary("ai.queue_wait_ms")
+    print(f"{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms, end to end)")
+    print(f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+          f"{percentile(latencies, 99):>10.1f}{latencies[-1] if latencies else 0:>10.1f}")
+    print(f"\nthroughput: {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f} s")
+    print(f"outcomes:   {outcomes['ok']} ok, {outcomes['failed']} failed, {outcomes['shed']} shed")
+    print(f"queue wait: p50 {wait['p50']:.1f} ms, p95 {wait['p95']:.1f} ms")
+
+    await cog.session.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+AI Session Benchmark
+Latency of the old session-per-message GET against the pooled AI session
+(GET and POST transports), using a local stand-in for the AI API.
+
+The stand-in runs on 127.0.0.1 without TLS, so real-world savings are
+larger: every new session against the live API also pays DNS + TLS.
+
+Usage (from the Code directory):
+    python benchmarks/ai_session_benchmark.py [requests] [history_lines]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.ai import AI
+
+HOST, PORT = "127.0.0.1", 8799
+URL = f"http://{HOST}:{PORT}/api/search/blackbox-chat"
+
+
+async def stand_in(request):
+    if request.method == "POST":
+        text = (await request.json()).get("text", "")
+    else:
+        text = request.query.get("text", "")
+    return web.json_response({"status": True, "message": f"ano... ({len(text)} chars)"})
+
+
+def build_prompt(history_lines):
+    history = "\\n".join(f"User: pesan nomor {i} tentang kartu dan event" for i in range(history_lines))
+    return "Jawablah sebagai Shirokane Rinko dari BanG Dream! " + history
+
+
+async def old_path(prompt):
+    """Pre-change behaviour: a brand-new ClientSession per message, prompt in the URL."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(URL, params={"text": prompt, "apikey": "x"}) as resp:
+            return await resp.json()
+
+
+async def pooled(session, prompt, transport):
+    payload = {"text": prompt, "apikey": "x"}
+    request = session.post(URL, json=payload) if transport == "post" else session.get(URL, params=payload)
+    async with request as resp:
+        return await resp.json()
+
+
+async def measure(label, call, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            await call()
+        except Exception as e:
+            print(f"{label:<28}failed: {type(e).__name__} (HTTP {getattr(e, 'status', '?')})")
+            return
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28}{statistics.mean(samples):>10.2f}{samples[len(samples) // 2]:>10.2f}{p95:>10.2f}")
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    history_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    # Over-long GET URLs are rejected by the stand-in; report that as a failure, not a traceback
+    logging.getLogger("aiohttp.server").setLevel(logging.CRITICAL)
+
+    app = web.Application()
+    app.router.add_route("*", "/api/search/blackbox-chat", stand_in)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    prompt = build_prompt(history_lines)
+    print(f"{count} requests, prompt {len(prompt)} chars\n")
+    print(f"{'path':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    await measure("session per message (GET)", lambda: old_path(prompt), count)
+    session = AI.create_session()
+    await measure("pooled session (GET)", lambda: pooled(session, prompt, "get"), count)
+    await measure("pooled session (POST)", lambda: pooled(session, prompt, "post"), count)
+    await session.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+AI Stand-in Server
+Local imitation of the AI APIs for benchmarks and offline testing. Serves both
+the botcahx shape and the OpenAI-compatible chat completions shape, with
+configurable latency, jitter, error rate and reply size.
+
+Usage (from the Code directory):
+    python benchmarks/ai_stand_in.py [--port 8797] [--latency-ms 800] [--jitter-ms 200]
+                                     [--error-rate 0.02] [--reply-chars 400]
+
+Then point the bot at it, e.g.:
+    AI_BACKEND=openai OPENAI_API_URL=http://127.0.0.1:8797/v1
+"""
+
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+BOTCAHX_PATH = "/api/search/blackbox-chat"
+OPENAI_PATH = "/v1/chat/completions"
+REPLY_FILLER = "Ano... et-to... Rinko juga suka main piano dan game online. "
+
+
+class StandInSettings:
+    """Behaviour of the stand-in; may be changed while it is running."""
+
+    def __init__(self, latency_ms=800, jitter_ms=200, error_rate=0.0, reply_chars=400):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.reply_chars = reply_chars
+        self.requests = 0
+        self.errors = 0
+
+    def reply(self):
+        repeats = self.reply_chars // len(REPLY_FILLER) + 1
+        return (REPLY_FILLER * repeats)[:self.reply_chars]
+
+    async def simulate(self):
+        """Wait out the simulated latency. Returns False if this request should fail."""
+        self.requests += 1
+        delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        await asyncio.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return False
+        return True
+
+
+def create_app(settings):
+    async def botcahx(request):
+        if not await settings.simulate():
+            return web.json_response({"status": False, "message": "Service unavailable"}, status=503)
+        return web.json_response({"status": True, "message": settings.reply()})
+
+    async def openai(request):
+        if not await settings.simulate():
+            return web.json_response({"error": {"message": "Service unavailable"}}, status=503)
+        return web.json_response({
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": settings.reply()}}],
+        })
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_route("*", BOTCAHX_PATH, botcahx)
+    app.router.add_post(OPENAI_PATH, openai)
+    return app
+
+
+async def start_stand_in(settings, host="127.0.0.1", port=8797):
+    """Start the stand-in on host:port. Returns the AppRunner (call cleanup() to stop)."""
+    runner = web.AppRunner(create_app(settings), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the AI chat APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8797)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-chars", type=int, default=400)
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    settings = StandInSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.reply_chars)
+    runner = await start_stand_in(settings, args.host, args.port)
+    print(f"AI stand-in on http://{args.host}:{args.port}")
+    print(f"  botcahx: {BOTCAHX_PATH}")
+    print(f"  openai:  {OPENAI_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,86 @@
+"""
+Bestdori Parse Benchmark
+Peak RSS and parse time of response.json()-style parsing versus the
+streaming projection parser, on a recorded all.5.json payload.
+
+Each mode runs in its own subprocess so peak RSS is not shared.
+
+Usage (from the Code directory):
+    python benchmarks/bestdori_parse_benchmark.py path/to/cards_all.5.json [cards|events]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bestdori_index import project_card, project_event
+from utils.bestdori_stream import StreamingProjector
+
+PROJECTORS = {"cards": project_card, "events": project_event}
+CHUNK_SIZE = 64 * 1024
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_json(path, project):
+    """Old path: read the whole body, build the full tree, then project."""
+    with open(path, "rb") as f:
+        body = f.read()
+    document = json.loads(body)
+    return {str(k): project(k, v) for k, v in document.items()}
+
+
+def run_stream(path, project):
+    """New path: feed the body in network-sized chunks, projecting as we go."""
+    parser = StreamingProjector(project)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            parser.feed(chunk)
+    return parser.close()
+
+
+def child(mode, path, dataset):
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    records = (run_json if mode == "json" else run_stream)(path, PROJECTORS[dataset])
+    elapsed = (time.perf_counter() - start) * 1000
+    print(json.dumps({
+        "records": len(records),
+        "ms": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "delta_mb": peak_rss_mb() - baseline,
+    }))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    if sys.argv[1] == "--child":
+        child(*sys.argv[2:5])
+        return
+
+    path = sys.argv[1]
+    dataset = sys.argv[2] if len(sys.argv) > 2 else "cards"
+    print(f"Payload: {os.path.getsize(path) / 1e6:.1f} MB ({dataset})\n")
+    print(f"{'mode':<10}{'records':>9}{'parse ms':>12}{'peak RSS MB':>14}{'RSS growth MB':>16}")
+    for mode in ("json", "stream"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, path, dataset],
+            capture_output=True, text=True, check=True
+        ).stdout
+        r = json.loads(out)
+        print(f"{mode:<10}{r['records']:>9}{r['ms']:>12.1f}{r['peak_rss_mb']:>14.1f}{r['delta_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Card Index Benchmark
+Compares the old per-member download+scan path against CardIndex lookups.
+
+Usage (from the Code directory):
+    python benchmarks/card_index_benchmark.py path/to/cards_all.5.json
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bestdori import BAND_MAP, CHARACTER_MAP
+from utils.bestdori_index import CardIndex, project_cards
+
+QUERIES = [
+    ("roselia", None, None),
+    ("roselia", "limited", None),
+    ("afterglow", "dream_fes", 4),
+    ("poppin party", "birthday", None),
+]
+
+
+def legacy_character_cards(body, char_id, card_type_filter=None, rarity_filter=None):
+    """The pre-index path: every call re-parses the payload and scans every card."""
+    all_cards = json.loads(body)
+    found = []
+    for card_id, card_data in all_cards.items():
+        if card_data.get("characterId") != char_id:
+            continue
+        card_type = card_data.get("type", "permanent")
+        rarity = card_data.get("rarity", 3)
+        if rarity_filter is not None and rarity < rarity_filter:
+            continue
+        if card_type_filter:
+            filter_lower = card_type_filter.lower()
+            if filter_lower in card_type.lower():
+                pass
+            elif filter_lower == "limited":
+                if card_type not in ["limited", "dream_fes", "birthday", "kirafes"]:
+                    continue
+            elif "dream" in filter_lower or "fes" in filter_lower:
+                if "dream_fes" not in card_type and "kirafes" not in card_type:
+                    continue
+            else:
+                continue
+        released_at = card_data.get("releasedAt", [0])
+        found.append((card_id, released_at[0] if released_at else 0))
+    found.sort(key=lambda x: int(x[1] or 0), reverse=True)
+    return found[:5]
+
+
+def legacy_band_cards(body, band, card_type_filter, rarity_filter):
+    found = []
+    for member in BAND_MAP[band]:
+        found.extend(legacy_character_cards(body, CHARACTER_MAP[member], card_type_filter, rarity_filter))
+    found.sort(key=lambda x: int(x[1] or 0), reverse=True)
+    return found[:1]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    with open(sys.argv[1], "rb") as f:
+        body = f.read()
+
+    build_ms = timed(lambda: CardIndex(project_cards(json.loads(body))), 3)
+    index = CardIndex(project_cards(json.loads(body)))
+    print(f"Snapshot: {len(body) / 1e6:.1f} MB, {len(index)} cards")
+    print(f"Index build (parse + index, once per refresh): {build_ms:.1f} ms\n")
+
+    print(f"{'query':<36}{'legacy ms':>12}{'index ms':>12}{'speedup':>10}")
+    for band, card_type, rarity in QUERIES:
+        ids = [CHARACTER_MAP[m] for m in BAND_MAP[band]]
+        legacy_ms = timed(lambda: legacy_band_cards(body, band, card_type, rarity), 3)
+        index_ms = timed(lambda: index.newest(ids, card_type, rarity, 1), 1000)
+        label = f"{band} {card_type or '*'} {rarity or '*'}★"
+        print(f"{label:<36}{legacy_ms:>12.2f}{index_ms:>12.4f}{legacy_ms / index_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Database Benchmark
+Operations per second of the old connect-per-call SQLite helpers (default
+rollback journal, run on the event loop) against utils.database.Database
+(one WAL connection on a worker thread), on a throwaway database.
+
+Usage (from the Code directory):
+    python benchmarks/database_benchmark.py [operations] [users]
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+# Every Database operation runs in this one guild (the legacy table had no guilds)
+GUILD_ID = 1
+
+
+# ----------------------------------------------------------------------------
+# Pre-change helpers, verbatim apart from the database path
+# ----------------------------------------------------------------------------
+def legacy_initialize(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS users (user_id TEXT PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 0)")
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_user_data(path, user_id):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT xp, level FROM users WHERE user_id = ?", (str(user_id),))
+    data = cursor.fetchone()
+    if not data:
+        cursor.execute("INSERT INTO users (user_id, xp, level) VALUES (?, 0, 0)", (str(user_id),))
+        conn.commit()
+        data = (0, 0)
+    conn.close()
+    return {"xp": data[0], "level": data[1]}
+
+
+def legacy_update_user_xp(path, user_id, new_xp, new_level):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET xp = ?, level = ? WHERE user_id = ?", (new_xp, new_level, str(user_id)))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_top_users(path, limit=10):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id, xp, level FROM users ORDER BY xp DESC LIMIT ?", (limit,))
+    data = cursor.fetchall()
+    conn.close()
+    return data
+
+
+def workload(operations, users, seed=7):
+    """The same mixed sequence for both layers: 45% reads, 45% XP updates, 10% top-10."""
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(operations):
+        roll = rng.random()
+        user_id = rng.randrange(users)
+        if roll < 0.45:
+            ops.append(("get", user_id))
+        elif roll < 0.9:
+            ops.append(("update", user_id, rng.randint(0, 100000)))
+        else:
+            ops.append(("top",))
+    return ops
+
+
+async def run_legacy(path, ops):
+    legacy_initialize(path)
+    for user_id in range(max(op[1] for op in ops if len(op) > 1) + 1):
+        legacy_get_user_data(path, user_id)
+
+    start = time.perf_counter()
+    for op in ops:
+        # The old code ran these directly on the event loop
+        if op[0] == "get":
+            legacy_get_user_data(path, op[1])
+        elif op[0] == "update":
+            legacy_update_user_xp(path, op[1], op[2], 0)
+        else:
+            legacy_get_top_users(path)
+    return time.perf_counter() - start
+
+
+async def run_async(path, ops, concurrency):
+    db = Database(path)
+    await db.initialize()
+    for user_id in range(max(op[1] for op in ops if len(op) > 1) + 1):
+        await db.get_user_data(GUILD_ID, user_id)
+
+    queue = iter(ops)
+
+    async def worker():
+        for op in queue:
+            if op[0] == "get":
+                await db.get_user_data(GUILD_ID, op[1])
+            elif op[0] == "update":
+                await db.update_user_xp(GUILD_ID, op[1], op[2], 0)
+            else:
+                await db.get_top_users(GUILD_ID)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed
+
+
+async def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    ops = workload(operations, users)
+    workdir = tempfile.mkdtemp()
+
+    print(f"{operations} operations over {users} users (45% get, 45% update, 10% top-10)\n")
+    print(f"{'layer':<40}{'seconds':>10}{'ops/sec':>12}")
+
+    elapsed = await run_legacy(os.path.join(workdir, "legacy.db"), ops)
+    baseline = operations / elapsed
+    print(f"{'connect per call (legacy)':<40}{elapsed:>10.2f}{baseline:>12.0f}")
+
+    for concurrency in (1, 16):
+        elapsed = await run_async(os.path.join(workdir, f"async_{concurrency}.db"), ops, concurrency)
+        rate = operations / elapsed
+        label = f"Database, {concurrency} concurrent caller(s)"
+        print(f"{label:<40}{elapsed:>10.2f}{rate:>12.0f}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Intent Router Benchmark
+Per-message cost of the old chain of `in` checks + per-name re.search
+against the single compiled IntentRouter, on a corpus of chat lines.
+
+Usage (from the Code directory):
+    python benchmarks/intent_router_benchmark.py [corpus.txt]
+
+Without a corpus file, a built-in sample of server chat lines is used.
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bestdori import BAND_MAP, CHARACTER_MAP
+from utils.intent_router import IntentRouter
+
+SAMPLE_CORPUS = [
+    "event jp sekarang apa?",
+    "Event JP sekarang apa ya kak",
+    "kartu rinko terbaru",
+    "Kartu Dream Fest Rinko",
+    "kartu roselia limited dong",
+    "ada kartu 5 star yukina yang baru ga?",
+    "gacha terbaru apa",
+    "gacha jp sekarang rate up siapa",
+    "kartu kira fest afterglow",
+    "kartu birthday sayo kapan rilis",
+    "rinko kamu suka main game apa?",
+    "halo rinko, apa kabar hari ini?",
+    "aku lagi bosen nih, ngobrol yuk",
+    "menurut kamu lagu roselia yang paling bagus apa?",
+    "btw kemarin aku main valorant kalah terus",
+    "kartu poppin party 4 bintang",
+    "card hello happy world birthday",
+    "kamu tau event yang kemarin ga",
+    "kartu chu2 terbaru",
+    "what's the newest pastel palettes card?",
+    "ano... rinko, bisa ajarin piano?",
+    "kartu raise a suilen limited 5-star",
+    "eve suka bushido ya",
+    "kartu morfonica dream fest",
+    "hari ini hujan terus, males keluar",
+    "siapa member favorit kamu di afterglow?",
+    "kartu lisa 4 star terbaru",
+    "event now di server jp berakhir kapan",
+    "ada gacha dreamfest ga minggu ini",
+    "selamat malam rinko, tidur yang nyenyak ya",
+]
+
+
+def legacy_route(query_lower):
+    """The pre-router detection chain from AI.get_ai_response."""
+    if "event" in query_lower and ("jp" in query_lower or "jepang" in query_lower or "now" in query_lower or "sekarang" in query_lower):
+        return ("event", None, None, None, None)
+    if "gacha" in query_lower:
+        return ("gacha", None, None, None, None)
+    if not ("kartu" in query_lower or "card" in query_lower):
+        return (None, None, None, None, None)
+
+    target_rarity = None
+    rarity_match = re.search(r'(\d)\s*(?:star|bintang|-star)', query_lower)
+    if rarity_match:
+        target_rarity = int(rarity_match.group(1))
+
+    target_type = None
+    if "dream" in query_lower and "fest" in query_lower:
+        target_type = "dream_fes"
+    elif "kira" in query_lower and "fest" in query_lower:
+        target_type = "kirafes"
+    elif "limited" in query_lower:
+        target_type = "limited"
+    elif "birthday" in query_lower:
+        target_type = "birthday"
+
+    target_band = None
+    for band_name in BAND_MAP.keys():
+        if re.search(r'\b' + re.escape(band_name) + r'\b', query_lower):
+            target_band = band_name
+            break
+    target_char = None
+    if not target_band:
+        for char_name in CHARACTER_MAP.keys():
+            if re.search(r'\b' + re.escape(char_name) + r'\b', query_lower):
+                target_char = char_name
+                break
+    return ("card", target_band, target_char, target_rarity, target_type)
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = SAMPLE_CORPUS
+    lines = [line.lower() for line in corpus]
+
+    router = IntentRouter(CHARACTER_MAP, BAND_MAP)
+
+    def new_route(line):
+        intent = router.route(line)
+        if intent.intent != "card":
+            return (intent.intent, None, None, None, None)
+        return (intent.intent, intent.band, intent.character, intent.rarity, intent.card_type)
+
+    mismatches = [line for line in lines if legacy_route(line) != new_route(line)]
+
+    rounds = max(1, 20000 // len(lines))
+    results = {}
+    for label, fn in (("legacy", legacy_route), ("router", new_route)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for line in lines:
+                fn(line)
+        results[label] = (time.perf_counter() - start) / (rounds * len(lines)) * 1e6
+
+    print(f"Corpus: {len(lines)} lines x {rounds} rounds")
+    print(f"legacy: {results['legacy']:.2f} µs/message")
+    print(f"router: {results['router']:.2f} µs/message ({results['legacy'] / results['router']:.1f}x faster)")
+    print(f"Differences: {len(mismatches)}")
+    for line in mismatches:
+        print(f"  {line!r}: legacy={legacy_route(line)} router={new_route(line)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Single-Flight Benchmark
+N concurrent identical requests against local stand-ins for the AI API and
+Bestdori, counting how many requests actually reach each upstream.
+
+Usage (from the Code directory):
+    python benchmarks/singleflight_benchmark.py [callers]
+
+Exits non-zero if any burst reaches its upstream more than once. The
+coalescing guarantee itself is unit-tested in tests/test_singleflight.py;
+this script is for end-to-end timings.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import commands.ai as ai_module
+import utils.bestdori as bestdori
+import utils.bestdori_snapshot as bestdori_snapshot
+from commands.ai import AI
+from utils.ai_backends import BotcahxBackend
+
+HOST, PORT = "127.0.0.1", 8798
+BASE = f"http://{HOST}:{PORT}"
+UPSTREAM_DELAY = 0.2  # seconds, so every caller arrives while the first request is in flight
+
+EVENTS = {
+    "1": {
+        "eventName": ["Benchmark Event", None, None, None, None],
+        "eventType": "story",
+        "startAt": [str(int(time.time() * 1000) - 86400000), None, None, None, None],
+        "endAt": [str(int(time.time() * 1000) + 86400000), None, None, None, None],
+        "assetBundleName": "benchmark",
+    }
+}
+
+HITS = {"ai": 0, "bestdori": 0}
+
+
+async def ai_stand_in(request):
+    HITS["ai"] += 1
+    await asyncio.sleep(UPSTREAM_DELAY)
+    return web.json_response({"status": True, "message": "ano... event sekarang Benchmark Event."})
+
+
+async def bestdori_stand_in(request):
+    HITS["bestdori"] += 1
+    await asyncio.sleep(UPSTREAM_DELAY)
+    return web.Response(body=json.dumps(EVENTS), content_type="application/json")
+
+
+async def burst(label, key, callers, make_call):
+    HITS[key] = 0
+    start = time.perf_counter()
+    results = await asyncio.gather(*(make_call() for _ in range(callers)))
+    elapsed = (time.perf_counter() - start) * 1000
+    answered = sum(1 for result in results if isinstance(result, dict) and result)
+    print(f"{label:<34}{callers:>8}{HITS[key]:>10}{answered:>10}{elapsed:>10.0f}")
+    return HITS[key] == 1
+
+
+async def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    app = web.Application()
+    app.router.add_route("*", "/ai", ai_stand_in)
+    app.router.add_get("/bestdori/events", bestdori_stand_in)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    # Point both clients at the stand-ins; no snapshot, so Bestdori starts cold
+    ai_module.AI_CONVERSATION_DB = None
+    bestdori.DATASETS["events"] = f"{BASE}/bestdori/events"
+    bestdori_snapshot.SNAPSHOT_DIR = tempfile.mkdtemp()
+
+    print(f"{'burst':<34}{'callers':>8}{'upstream':>10}{'answered':>10}{'ms':>10}")
+
+    client = bestdori.BestdoriClient()
+    ok = await burst("Bestdori cold fetch (events)", "bestdori", callers, lambda: client.get("events"))
+    ok &= await burst("Bestdori forced refresh (events)", "bestdori", callers, lambda: client.refresh("events"))
+
+    cog = AI(None)
+    cog.session = AI.create_session()
+    cog.backend = BotcahxBackend(f"{BASE}/ai", "benchmark")
+    ok &= await burst("AI !ai (same question)", "ai", callers,
+                      lambda: cog.get_ai_response("halo rinko, apa kabar?"))
+
+    await cog.session.close()
+    await client.close()
+    await runner.cleanup()
+
+    print("\nOK: one upstream request per burst" if ok else "\nFAIL: a burst fanned out")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
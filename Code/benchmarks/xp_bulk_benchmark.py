@@ -0,0 +1,122 @@
+"""
+Bulk XP Benchmark
+Seconds per bulk admin operation over one large guild on a throwaway database:
+a row-at-a-time Python level recalculation (one UPDATE per member, the way
+!addxp computes levels) against the vectorized utils.xp_bulk operations.
+
+Usage (from the Code directory):
+    python benchmarks/xp_bulk_benchmark.py [users]
+"""
+
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+from utils.xp_bulk import decay_xp, export_xp, import_xp, level_for_xp, levels_for_xp, recalculate_levels
+
+GUILD_ID = 1
+
+
+def seed(conn, users, rng):
+    """users rows with random XP, stale levels and activity spread over 90 days."""
+    now = int(time.time())
+    with conn:
+        conn.executemany(
+            "INSERT INTO guild_users (guild_id, user_id, xp, level, last_active) VALUES (?, ?, ?, ?, ?)",
+            [
+                (str(GUILD_ID), str(10 ** 17 + user_id), rng.randint(0, 500000), 0, now - rng.randint(0, 90 * 86400))
+                for user_id in range(users)
+            ]
+        )
+    return now
+
+
+def row_by_row_recalculate(conn, guild_id):
+    """Baseline: read every row, compute its level in Python, one UPDATE per changed member."""
+    rows = conn.execute("SELECT user_id, xp, level FROM guild_users WHERE guild_id = ?", (str(guild_id),)).fetchall()
+    changed = 0
+    for user_id, xp, level in rows:
+        new_level = int(math.sqrt(xp / 100))
+        if new_level != level:
+            with conn:
+                conn.execute(
+                    "UPDATE guild_users SET level = ? WHERE guild_id = ? AND user_id = ?",
+                    (new_level, str(guild_id), user_id)
+                )
+            changed += 1
+    return changed, len(rows)
+
+
+def reset_levels(conn, guild_id):
+    with conn:
+        conn.execute("UPDATE guild_users SET level = 0 WHERE guild_id = ?", (str(guild_id),))
+
+
+def check_levels(conn, guild_id):
+    """Every stored level matches the scalar closed form."""
+    rows = conn.execute("SELECT xp, level FROM guild_users WHERE guild_id = ?", (str(guild_id),)).fetchall()
+    return all(level == level_for_xp(xp) for xp, level in rows)
+
+
+async def timed(db, operation, *args):
+    start = time.perf_counter()
+    result = await db.run(operation, GUILD_ID, *args)
+    return result, time.perf_counter() - start
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(7)
+    db = Database(os.path.join(tempfile.mkdtemp(), "xp_bulk.db"))
+    await db.initialize()
+    now = await db.run(seed, users, rng)
+
+    # The vectorized level formula agrees with the scalar one around every perfect square
+    sample = [100 * level * level + delta for level in range(0, 20000) for delta in (-1, 0, 1)]
+    assert all(a == level_for_xp(xp) for xp, a in zip(sample, levels_for_xp(np.array(sample))))
+
+    print(f"{users} users in one guild\n")
+    print(f"{'operation':<44}{'seconds':>10}{'rows changed':>15}")
+
+    (changed, _), elapsed = await timed(db, row_by_row_recalculate)
+    baseline = elapsed
+    print(f"{'recalculate levels (row by row)':<44}{elapsed:>10.2f}{changed:>15}")
+
+    await db.run(reset_levels, GUILD_ID)
+    (changed, _), elapsed = await timed(db, recalculate_levels)
+    print(f"{'recalculate levels (xp_bulk)':<44}{elapsed:>10.2f}{changed:>15}  ({baseline / elapsed:.1f}x)")
+    assert await db.run(check_levels, GUILD_ID)
+
+    (changed, _), elapsed = await timed(db, decay_xp, 10, 30 * 86400, now)
+    print(f"{'decay 10% (inactive >= 30 days)':<44}{elapsed:>10.2f}{changed:>15}")
+    assert await db.run(check_levels, GUILD_ID)
+
+    data, elapsed = await timed(db, export_xp, "csv")
+    print(f"{'export CSV':<44}{elapsed:>10.2f}{'':>15}  ({len(data) / 1e6:.1f} MB)")
+
+    count, elapsed = await timed(db, import_xp, data, "csv")
+    print(f"{'import CSV':<44}{elapsed:>10.2f}{count:>15}")
+
+    try:
+        parquet, elapsed = await timed(db, export_xp, "parquet")
+    except ImportError as e:
+        print(f"{'export/import Parquet':<44}{'skipped':>10}  ({e})")
+    else:
+        print(f"{'export Parquet':<44}{elapsed:>10.2f}{'':>15}  ({len(parquet) / 1e6:.1f} MB)")
+        count, elapsed = await timed(db, import_xp, parquet, "parquet")
+        print(f"{'import Parquet':<44}{elapsed:>10.2f}{count:>15}")
+
+    await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
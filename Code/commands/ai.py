@@ -3,15 +3,38 @@ AI Commands Cog
 AI chat functionality including auto-AI mode
 """
 
+import time
+
 import aiohttp
-import requests
 from discord.ext import commands
 import discord
-from config import AI_API_KEY, AI_API_URL
+from config import (AI_API_KEY, AI_API_URL, AI_API_TRANSPORT, AI_REQUEST_TIMEOUT_SECONDS, AI_MAX_CONNECTIONS,
+                    AI_BACKEND, OPENAI_API_URL, OPENAI_API_KEY, OPENAI_MODEL, AI_MOCK_LATENCY_SECONDS,
+                    AI_CONVERSATION_TURNS, AI_MEMORY_BUDGET_BYTES, AI_CONVERSATION_IDLE_SECONDS, AI_CONVERSATION_DB,
+                    AI_CONTEXT_BUDGET_CHARS, AI_SUMMARY_BUDGET_CHARS, AI_RESPONSE_CACHE_SIZE, AI_RESPONSE_CACHE_TTL,
+                    AI_MAX_CONCURRENT_REQUESTS, AI_MAX_QUEUE_DEPTH, AI_GUILD_WEIGHTS)
+
+
+from utils.ai_backends import create_backend
+from utils.ai_scheduler import FairScheduler, SchedulerFull
+from utils.conversation_store import ConversationStore, ROLE_USER, ROLE_AI
+from utils.metrics import metrics
+from utils.reply_renderer import send_ai_reply
+from utils.singleflight import SingleFlight
+from utils.ttl_cache import TTLCache
+from utils.intent_router import IntentRouter, INTENT_CARD, INTENT_EVENT, INTENT_GACHA
+from utils.bestdori import client as bestdori_client, get_jp_event, get_current_gacha, get_character_cards, get_band_cards, resolve_name, CHARACTER_MAP, BAND_MAP
+
+# Compiled once: every band/character name and intent keyword
+intent_router = IntentRouter(CHARACTER_MAP, BAND_MAP)
 
+# Minimum fuzzy-match confidence before a misspelled name gets card context
+FUZZY_NAME_CONFIDENCE = 0.8
 
-import re
-from utils.bestdori import get_jp_event, get_character_cards, get_band_cards, CHARACTER_MAP, BAND_MAP
+
+def normalize_prompt(prompt):
+    """Cache key for a final prompt: case and whitespace differences don't matter."""
+    return " ".join(prompt.casefold().split())
 
 class AI(commands.Cog):
     """AI chat and conversation functionality"""
@@ -20,9 +43,89 @@ class AI(commands.Cog):
         self.bot = bot
         # Auto-AI feature state
         self.autoai_users = set()  # Users who have auto-AI enabled
-        self.user_conversations = {}  # Per-user conversation history {user_id: [messages]}
+        # Per-user conversation history, bounded by a global memory budget
+        self.conversations = ConversationStore(
+            max_turns=AI_CONVERSATION_TURNS,
+            memory_budget=AI_MEMORY_BUDGET_BYTES,
+            idle_seconds=AI_CONVERSATION_IDLE_SECONDS,
+            db_path=AI_CONVERSATION_DB,
+            context_budget=AI_CONTEXT_BUDGET_CHARS,
+            summary_budget=AI_SUMMARY_BUDGET_CHARS
+        )
+        # Replies to stateless prompts (!ai, mentions), keyed on the normalized final prompt
+        self.response_cache = TTLCache(maxsize=AI_RESPONSE_CACHE_SIZE, ttl=AI_RESPONSE_CACHE_TTL)
+        # Identical prompts in flight at the same time share one upstream request
+        self.upstream = SingleFlight()
+        # Global cap on AI calls, shared fairly between guilds and their users
+        self.scheduler = FairScheduler(
+            max_concurrency=AI_MAX_CONCURRENT_REQUESTS,
+            max_queue=AI_MAX_QUEUE_DEPTH,
+            guild_weights=AI_GUILD_WEIGHTS,
+            on_wait=lambda seconds: metrics.observe("ai.queue_wait_ms", seconds * 1000)
+        )
+        self.session = None  # Shared AI API session, opened in cog_load
+        self.backend = self.create_backend()
+
+    async def cog_load(self):
+        """Open the pooled AI session and keep Bestdori data refreshed in the background."""
+        self.session = self.create_session()
+        bestdori_client.start_refresher()
+
+    async def cog_unload(self):
+        """Close the AI session and conversation store, stop the Bestdori refresher and close its HTTP session."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.conversations.close()
+        await bestdori_client.close()
+
+    @staticmethod
+    def create_session():
+        """
+        Long-lived session for the AI API: keep-alive connections are reused
+        across messages and DNS lookups are cached, so replies skip TCP/TLS setup.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=AI_MAX_CONNECTIONS,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(total=AI_REQUEST_TIMEOUT_SECONDS, connect=10)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    @staticmethod
+    def create_backend():
+        """The chat backend selected by AI_BACKEND ("botcahx", "openai" or "mock")."""
+        settings = {
+            "botcahx": {"url": AI_API_URL, "api_key": AI_API_KEY, "transport": AI_API_TRANSPORT},
+            "openai": {"base_url": OPENAI_API_URL, "api_key": OPENAI_API_KEY, "model": OPENAI_MODEL},
+            "mock": {"latency": AI_MOCK_LATENCY_SECONDS},
+        }
+        return create_backend(AI_BACKEND, **settings.get(AI_BACKEND, {}))
+
+    async def request_ai(self, prompt: str):
+        """
+        Send a prompt to the configured backend over the shared session.
+        Returns the reply text, or None if the backend reported a failure.
+        """
+        if self.session is None or self.session.closed:
+            self.session = self.create_session()
+        return await self.backend.complete(self.session, prompt)
     
-    async def get_ai_response(self, query: str, user_id: int = None, use_memory: bool = False):
+    async def scheduled_request(self, prompt: str, guild_id: int = None, requester_id: int = None):
+        """
+        request_ai() once the fair scheduler grants a slot.
+        Upstream latency goes to "ai.upstream_ms"; time spent queued is recorded by the scheduler.
+        Raises SchedulerFull when the queue is at AI_MAX_QUEUE_DEPTH.
+        """
+        async with self.scheduler.slot(guild_id, requester_id):
+            start = time.perf_counter()
+            try:
+                return await self.request_ai(prompt)
+            finally:
+                metrics.observe("ai.upstream_ms", (time.perf_counter() - start) * 1000)
+
+    async def get_ai_response(self, query: str, user_id: int = None, use_memory: bool = False,
+                              guild_id: int = None, requester_id: int = None):
         """
         Get AI response from the API.
         
@@ -39,61 +142,67 @@ class AI(commands.Cog):
         image_url = None
         
         query_lower = query.lower()
+        # Intent, entity, rarity and card type in a single regex pass
+        intent = intent_router.route(query_lower)
         
         # 1. Check for Event JP
-        if "event" in query_lower and ("jp" in query_lower or "jepang" in query_lower or "now" in query_lower or "sekarang" in query_lower):
-            event_data = get_jp_event()
+        if intent.intent == INTENT_EVENT:
+            event_data = await get_jp_event()
             if event_data:
                 import datetime
+                start_date = datetime.datetime.fromtimestamp(event_data['start_time'] / 1000).strftime('%d %B %Y')
                 end_date = datetime.datetime.fromtimestamp(event_data['end_time'] / 1000).strftime('%d %B %Y')
                 bestdori_context += (
                     f" [INFO UTAMA: Saat ini event di server JP adalah '{event_data['name']}'. "
-                    f"Status: {event_data['status']}. Berakhir pada: {end_date}. "
+                    f"Status: {event_data['status']}. Dimulai pada: {start_date}. Berakhir pada: {end_date}. "
                     f"Kamu HARUS memberitahu user tentang event ini.]"
                 )
                 image_url = event_data.get("image")
         
-        # 2. Check for Character Cards (Generic)
-        elif "kartu" in query_lower or "card" in query_lower:
-            target_char = None
-            target_band = None
-            target_type = None
-            target_rarity = None
-            
-            # --- Detect Rarity ---
-            # Match patterns like '4 star', '5 bintang', '4-star', etc.
-            rarity_match = re.search(r'(\d)\s*(?:star|bintang|-star)', query_lower)
-            if rarity_match:
-                target_rarity = int(rarity_match.group(1))
+        # 2. Check for current JP Gacha
+        elif intent.intent == INTENT_GACHA:
+            gachas = await get_current_gacha(limit=3)
+            if gachas:
+                import datetime
+                gacha_lines = []
+                for gacha in gachas:
+                    end_date = datetime.datetime.fromtimestamp(gacha['end_time'] / 1000).strftime('%d %B %Y')
+                    rate_up = ", ".join(f"'{c['title']}' ({c['rarity']} Bintang)" for c in gacha['rate_up'][:4])
+                    gacha_lines.append(
+                        f"'{gacha['name']}' (berakhir {end_date}"
+                        + (f", rate-up: {rate_up}" if rate_up else "") + ")"
+                    )
+                bestdori_context += (
+                    f" [INFO UTAMA: Gacha yang sedang berjalan di server JP: {'; '.join(gacha_lines)}. "
+                    f"Kamu HARUS memberitahu user tentang gacha ini.]"
+                )
+                image_url = gachas[0].get("image")
 
-            # --- Detect Card Type ---
-            if "dream" in query_lower and "fest" in query_lower:
-                target_type = "dream_fes"
-            elif "kira" in query_lower and "fest" in query_lower:
-                target_type = "kirafes"
-            elif "limited" in query_lower:
-                target_type = "limited"
-            elif "birthday" in query_lower:
-                target_type = "birthday"
+        # 3. Check for Character Cards (Generic)
+        elif intent.intent == INTENT_CARD:
+            target_char = intent.character
+            target_band = intent.band
+            target_type = intent.card_type
+            target_rarity = intent.rarity
 
-            # --- Detect Band Name (check BEFORE individual characters) ---
-            for band_name in BAND_MAP.keys():
-                # Use word-boundary regex to avoid partial matches
-                if re.search(r'\b' + re.escape(band_name) + r'\b', query_lower):
-                    target_band = band_name
-                    break
+            # --- Fall back to fuzzy matching (typos, full names, aliases) ---
+            if not target_band and not target_char:
+                match = resolve_name(query_lower)
+                # Names without Bestdori character IDs are recognized but have no card data
+                if match and match.confidence >= FUZZY_NAME_CONFIDENCE:
+                    if match.kind == "band":
+                        target_band = match.name
+                    elif match.character_id is not None:
+                        target_char = match.name
 
-            # --- Detect Individual Character (word-boundary safe) ---
-            if not target_band:
-                for char_name in CHARACTER_MAP.keys():
-                    # \b ensures 'eve' won't match inside 'event'
-                    if re.search(r'\b' + re.escape(char_name) + r'\b', query_lower):
-                        target_char = char_name
-                        break
+            # A band none of whose members has a character ID can't be looked up either;
+            # leave it to the AI instead of claiming its cards don't exist
+            if target_band and not any(member in CHARACTER_MAP for member in BAND_MAP.get(target_band, [])):
+                target_band = None
 
             # --- Fetch Cards ---
             if target_band:
-                cards = get_band_cards(target_band, limit=1, card_type_filter=target_type, rarity_filter=target_rarity)
+                cards = await get_band_cards(target_band, limit=1, card_type_filter=target_type, rarity_filter=target_rarity)
                 if cards:
                     card = cards[0]
                     card_type_display = card['type'].replace("_", " ").title()
@@ -111,7 +220,7 @@ class AI(commands.Cog):
                         f"Beritahu user bahwa kartu tersebut belum ada atau tidak ditemukan.]"
                     )
             elif target_char:
-                cards = get_character_cards(target_char, limit=1, card_type_filter=target_type, rarity_filter=target_rarity)
+                cards = await get_character_cards(target_char, limit=1, card_type_filter=target_type, rarity_filter=target_rarity)
                 if cards:
                     card = cards[0]
                     card_type_display = card['type'].replace("_", " ").title()
@@ -129,18 +238,12 @@ class AI(commands.Cog):
 
         # Build conversation context if memory is enabled
         if use_memory and user_id:
-            if user_id not in self.user_conversations:
-                self.user_conversations[user_id] = []
+            # Add current message to history (the store keeps the last AI_CONVERSATION_TURNS)
+            await self.conversations.append(user_id, ROLE_USER, query)
             
-            # Add current message to history
-            self.user_conversations[user_id].append(f"User: {query}")
-            
-            # Limit conversation history to last 10 messages to avoid token limits
-            if len(self.user_conversations[user_id]) > 10:
-                self.user_conversations[user_id] = self.user_conversations[user_id][-10:]
-            
-            # Build context from history
-            context = "\\n".join(self.user_conversations[user_id])
+            # Build context from history: newest turns verbatim, older ones compacted to fit the budget
+            context = "\\n".join(await self.conversations.context(user_id))
+            metrics.observe("ai.context_chars", len(context))
             full_query = f"{context}\\n{bestdori_context}\\nRespond to the latest message."
         else:
             full_query = query + bestdori_context
@@ -167,65 +270,108 @@ class AI(commands.Cog):
         #     + full_query
         # )
         
-        # Encode query for URL
-        encoded_query = requests.utils.quote(prompt)
-        api_url = f"{AI_API_URL}?text={encoded_query}&apikey={AI_API_KEY}"
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url) as resp:
-                    data = await resp.json()
-                    
-                    if data.get("status"):
-                        response = data["message"]
-                        
-                        # Clean up response prefixes
-                        cleaned_response = response
-                        prefixes_to_remove = ["AI:", "Rinko:", "Bot:", "Shirokane Rinko:"]
-                        for prefix in prefixes_to_remove:
-                            if cleaned_response.startswith(prefix):
-                                cleaned_response = cleaned_response[len(prefix):].strip()
-                            elif cleaned_response.startswith(prefix.lower()): # Case insensitive check
-                                cleaned_response = cleaned_response[len(prefix):].strip()
-                        
-                        response = cleaned_response
-                        
-                        if image_url:
-                            # Return both text and image
-                            return {"text": response, "image": image_url}
+        metrics.observe("ai.prompt_chars", len(prompt))
 
-                        # Store AI response in conversation history
-                        if use_memory and user_id:
-                            self.user_conversations[user_id].append(f"AI: {response}")
-                        
-                        return {"text": response}
-                    else:
-                        return "⚠️ Gagal mendapatkan respons dari API."
+        # Stateless prompts are a pure function of the prompt text (Bestdori context included)
+        stateless = not (use_memory and user_id)
+        cache_key = normalize_prompt(prompt)
+        if stateless:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
+        try:
+            response = await self.upstream.do(
+                cache_key, lambda: self.scheduled_request(prompt, guild_id, requester_id or user_id)
+            )
+            if response:
+                # Clean up response prefixes
+                cleaned_response = response
+                prefixes_to_remove = ["AI:", "Rinko:", "Bot:", "Shirokane Rinko:"]
+                for prefix in prefixes_to_remove:
+                    if cleaned_response.startswith(prefix):
+                        cleaned_response = cleaned_response[len(prefix):].strip()
+                    elif cleaned_response.startswith(prefix.lower()): # Case insensitive check
+                        cleaned_response = cleaned_response[len(prefix):].strip()
+                
+                response = cleaned_response
+                
+                # Store AI response in conversation history
+                if use_memory and user_id:
+                    await self.conversations.append(user_id, ROLE_AI, response)
+                
+                result = {"text": response}
+                if image_url:
+                    # Return both text and image
+                    result["image"] = image_url
+                
+                if stateless:
+                    self.response_cache.set(cache_key, dict(result))
+                return result
+            else:
+                return "⚠️ Gagal mendapatkan respons dari API."
+        except SchedulerFull:
+            return "⏳ Ano... banyak yang sedang mengobrol dengan Rinko sekarang. Coba lagi sebentar lagi, ya..."
         except Exception as e:
+            metrics.incr("ai.errors")
             print(f"[AI ERROR] {e}")
             return "❌ Terjadi error saat menghubungi API."
     
     @commands.command()
     async def ai(self, ctx, *, query: str):
         """Ask the AI a question with tsundere personality."""
-        response = await self.get_ai_response(query)
-        if response:
-            if isinstance(response, dict):
-                text = response.get("text")
-                image = response.get("image")
-                
-                # Send text first as regular message
-                if text:
-                    await ctx.reply(text)
-                
-                # Send image as embed if available
-                if image:
-                    embed = discord.Embed(color=discord.Color.blue())
-                    embed.set_image(url=image)
-                    await ctx.send(embed=embed)
-            else:
-                await ctx.reply(response)
+        response = await self.get_ai_response(
+            query, guild_id=ctx.guild.id if ctx.guild else None, requester_id=ctx.author.id
+        )
+        await send_ai_reply(ctx, response)
     
+    @commands.command()
+    async def aistats(self, ctx):
+        """Show AI prompt size, upstream latency, scheduler, response cache and conversation memory stats."""
+        prompt = metrics.summary("ai.prompt_chars")
+        context = metrics.summary("ai.context_chars")
+        upstream = metrics.summary("ai.upstream_ms")
+        store = self.conversations.stats()
+        cache = self.response_cache
+        queue = self.scheduler.stats()
+        wait = metrics.summary("ai.queue_wait_ms")
+
+        embed = discord.Embed(title="📊 AI Stats", color=discord.Color.blue())
+        embed.add_field(
+            name="Prompt (chars)",
+            value=f"p50 {prompt['p50']:.0f} | p95 {prompt['p95']:.0f} | max {prompt['max']:.0f}",
+            inline=False
+        )
+        embed.add_field(
+            name="Conversation context (chars)",
+            value=f"p50 {context['p50']:.0f} | p95 {context['p95']:.0f} | max {context['max']:.0f}",
+            inline=False
+        )
+        embed.add_field(
+            name="Upstream latency (ms)",
+            value=(f"p50 {upstream['p50']:.0f} | p95 {upstream['p95']:.0f} | requests {upstream['count']} | "
+                   f"coalesced {self.upstream.shared} | errors {metrics.counter('ai.errors')}"),
+            inline=False
+        )
+        embed.add_field(
+            name="Scheduler",
+            value=(f"{queue['active']}/{self.scheduler.max_concurrency} running | {queue['queued']} queued "
+                   f"(max {queue['max_queued']}) | {queue['shed']} shed | "
+                   f"wait p50 {wait['p50']:.0f} ms, p95 {wait['p95']:.0f} ms"),
+            inline=False
+        )
+        embed.add_field(
+            name="Response cache",
+            value=f"{cache.hits} hits | {cache.misses} misses | {cache.hit_rate():.0%} hit rate | {len(cache)} entries",
+            inline=False
+        )
+        embed.add_field(
+            name="Conversation memory",
+            value=f"{store['users']} users | {store['bytes'] / 1024:.1f} KiB | {store['evictions']} evicted",
+            inline=False
+        )
+        await ctx.reply(embed=embed)
+
     @commands.command()
     async def autoai(self, ctx, mode: str = None):
         """
@@ -252,7 +398,7 @@ class AI(commands.Cog):
                 await ctx.reply("ℹ️ Auto-AI mode is already enabled for you!", delete_after=5)
             else:
                 self.autoai_users.add(user_id)
-                self.user_conversations[user_id] = []  # Initialize conversation history
+                await self.conversations.clear(user_id)  # Start with a fresh conversation history
                 await ctx.reply(
                     "✅ **Auto-AI mode activated!**\n"
                     "Sekarang saya akan merespon semua pesan kamu tanpa perlu menggunakan `!ai`. "
@@ -264,8 +410,7 @@ class AI(commands.Cog):
             if user_id in self.autoai_users:
                 self.autoai_users.remove(user_id)
                 # Reset conversation memory
-                if user_id in self.user_conversations:
-                    del self.user_conversations[user_id]
+                await self.conversations.clear(user_id)
                 await ctx.reply(
                     "❌ **Auto-AI mode deactivated!**\n"
                     "Memori percakapan telah direset. Gunakan `!autoai on` untuk mengaktifkan kembali.",
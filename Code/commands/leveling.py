@@ -3,14 +3,21 @@ Leveling System Cog
 Handles XP tracking, leveling up, leaderboards, and auto-role rewards.
 """
 
+import asyncio
 import discord
+import io
 from discord.ext import commands
 import random
 import time
-from utils.database import get_user_data, update_user_xp, get_top_users, initialize_database
-
-# Initialize DB on load
-initialize_database()
+from config import LEVELING_LEGACY_GUILD_ID
+from utils.database import db
+from utils.leaderboard import GuildLeaderboards
+from utils.metrics import metrics
+from utils.name_resolver import NameResolver
+from utils.xp_buffer import XPBuffer
+from utils.xp_bulk import (
+    EXPORT_FORMATS, decay_xp, export_xp, import_xp, level_for_xp, recalculate_levels, xp_for_level
+)
 
 # Role Rewards Configuration
 # Format: {Level: Role_ID}
@@ -26,6 +33,9 @@ ROLE_REWARDS = {
     50: 1473888079054897346   # Legend
 }
 
+# Users per !leaderboard page
+LEADERBOARD_PAGE_SIZE = 10
+
 # Admin Restriction (User IDs who can use !setlevel and !addxp)
 # REPLACE WITH YOUR USER ID(s)
 ADMIN_IDS = [
@@ -38,7 +48,98 @@ class Leveling(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self._cd = commands.CooldownMapping.from_cooldown(1, 60, commands.BucketType.user) # 1 XP gain per 60s
+        self._cd = commands.CooldownMapping.from_cooldown(1, 60, commands.BucketType.member) # 1 XP gain per 60s per server
+        self.rankings = GuildLeaderboards()  # Per-guild XP rankings, updated on every XP write
+        self.xp = XPBuffer(rankings=self.rankings)  # In-memory XP, flushed to SQLite in batches
+        self.names = NameResolver(bot)  # Cached display names for leaderboard rows
+        # Set once XP reads are safe (no global XP left to migrate, or migration under way)
+        self.xp_ready = asyncio.Event()
+        self._migration = None
+        # One bulk operation at a time; XP gains in bulk_guild_id are skipped while it runs
+        self._bulk_lock = asyncio.Lock()
+        self.bulk_guild_id = None
+
+    async def cog_load(self):
+        await db.initialize()
+        self.rankings.load(await db.get_all_users())
+        self.xp.start()
+        if await db.has_legacy_table():
+            self._migration = asyncio.create_task(self.migrate_legacy_xp())
+        else:
+            self.xp_ready.set()
+
+    async def cog_unload(self):
+        """Flush pending XP and close the DB before the cog goes away (also runs on bot shutdown)."""
+        if self._migration:
+            self._migration.cancel()
+        await self.xp.close()
+        await db.close()
+
+    async def migrate_legacy_xp(self):
+        """
+        Move XP from the old global table into one guild: LEVELING_LEGACY_GUILD_ID,
+        or the bot's only server. Runs in the background while the bot serves messages.
+        """
+        guild_id = LEVELING_LEGACY_GUILD_ID
+        if guild_id is None:
+            await self.bot.wait_until_ready()
+            if len(self.bot.guilds) != 1:
+                print(
+                    f"[Leveling] Global XP table found but the bot is in {len(self.bot.guilds)} servers. "
+                    f"Set LEVELING_LEGACY_GUILD_ID to migrate it; leaving it untouched for now."
+                )
+                self.xp_ready.set()
+                return
+            guild_id = self.bot.guilds[0].id
+
+        print(f"[Leveling] Migrating global XP into guild {guild_id}...")
+        # Members read from now on get their global XP copied over first
+        db.migrating_guild_id = guild_id
+        self.xp_ready.set()
+        try:
+            count = await db.migrate_legacy(guild_id)
+        except Exception as e:
+            print(f"[Leveling] Migration failed: {e}")
+            return
+
+        # Rebuild that guild's ranking, then re-apply writes not yet flushed
+        board = self.rankings.get(guild_id)
+        board.load(await db.get_guild_users(guild_id))
+        self.reapply_buffered(guild_id)
+        print(f"[Leveling] Migrated {count} users into guild {guild_id}")
+
+    def reapply_buffered(self, guild_id):
+        """Apply a guild's buffered (possibly unflushed) rows on top of its freshly loaded ranking."""
+        board = self.rankings.get(guild_id)
+        for (row_guild_id, user_id), row in self.xp.rows.items():
+            if row_guild_id == guild_id:
+                board.update(user_id, row[0], row[1])
+
+    async def run_bulk(self, guild_id, operation, *args):
+        """
+        Run a utils.xp_bulk operation on the database thread with the guild's XP
+        gains paused: pending XP is flushed first, then the guild's buffered rows
+        and ranking are reloaded from the result. Returns (result, seconds).
+        """
+        await self.xp_ready.wait()
+        if self._migration and not self._migration.done():
+            await asyncio.shield(self._migration)  # Operate on the complete table
+
+        async with self._bulk_lock:
+            self.bulk_guild_id = guild_id
+            try:
+                await self.xp.flush()
+                start = time.perf_counter()
+                result = await db.run(operation, guild_id, *args)
+                elapsed = time.perf_counter() - start
+
+                # Rows cached (or written) meanwhile hold pre-operation values; drop them all
+                self.xp.forget_guild(guild_id, dirty=True)
+                self.rankings.get(guild_id).load(await db.get_guild_users(guild_id))
+            finally:
+                self.bulk_guild_id = None
+        metrics.observe("leveling.bulk_ms", elapsed * 1000)
+        return result, elapsed
 
     def get_xp_for_level(self, level):
         """Calculate total XP needed to reach a level."""
@@ -46,19 +147,18 @@ class Leveling(commands.Cog):
         # Lvl 1: 100
         # Lvl 2: 400
         # Lvl 5: 2500
-        return 100 * (level ** 2)
+        return xp_for_level(level)
 
     async def check_level_up(self, message, current_xp, current_level):
         """Check if user should level up and handle rewards."""
         user = message.author
-        next_level = current_level + 1
-        xp_needed = self.get_xp_for_level(next_level)
+        # Closed form, so a big XP jump lands on the right level at once
+        new_level = level_for_xp(current_xp)
         
-        if current_xp >= xp_needed:
-            new_level = current_level + 1
+        if new_level > current_level:
             
-            # Update DB
-            update_user_xp(user.id, current_xp, new_level)
+            # Update XP (flushed to the DB in the background)
+            self.xp.set(message.guild.id, user.id, current_xp, new_level)
             
             # Send notification in CHANNEL
             embed = discord.Embed(
@@ -68,8 +168,10 @@ class Leveling(commands.Cog):
             )
             await message.channel.send(embed=embed)
 
-            # Check Role Rewards
-            await self.check_role_reward(message, user, new_level)
+            # Check Role Rewards (highest milestone crossed)
+            highest_milestone = max((m for m in ROLE_REWARDS if m <= new_level), default=None)
+            if highest_milestone and highest_milestone > current_level:
+                await self.check_role_reward(message, user, highest_milestone)
             
             return True
         return False
@@ -95,8 +197,12 @@ class Leveling(commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message):
         """Monitor messages for XP gain."""
-        if message.author.bot:
-            return
+        if message.author.bot or not message.guild:
+            return  # XP is per server; no XP in DMs
+        if not self.xp_ready.is_set():
+            return  # Global XP migration is still starting up
+        if self.bulk_guild_id == message.guild.id:
+            return  # A bulk XP operation is rewriting this server's table
         
         # Check Cooldown
         bucket = self._cd.get_bucket(message)
@@ -108,20 +214,23 @@ class Leveling(commands.Cog):
         xp_gain = random.randint(15, 25)
         
         # Get current data
-        user_data = get_user_data(message.author.id)
-        current_xp = user_data["xp"] or 0
-        current_level = user_data["level"] or 0
+        user_data = await self.xp.get(message.guild.id, message.author.id)
+        if self.bulk_guild_id == message.guild.id:
+            return  # Read before a bulk operation started; writing it back would undo the operation
+        current_xp = user_data["xp"]
+        current_level = user_data["level"]
         
         new_xp = current_xp + xp_gain
         
-        # Check Level Up (updates DB inside)
+        # Check Level Up (updates XP inside)
         leveled_up = await self.check_level_up(message, new_xp, current_level)
         
         if not leveled_up:
             # Just update XP
-            update_user_xp(message.author.id, new_xp, current_level)
+            self.xp.set(message.guild.id, message.author.id, new_xp, current_level)
 
     @commands.hybrid_command(aliases=["level"])
+    @commands.guild_only()
     async def rank(self, ctx, member: discord.Member = None):
         """Check your current level and XP."""
         # Defer if interaction (slash command) takes time, though rank should be fast
@@ -129,10 +238,11 @@ class Leveling(commands.Cog):
             await ctx.interaction.response.defer()
             
         member = member or ctx.author
-        user_data = get_user_data(member.id)
+        await self.xp_ready.wait()
+        user_data = await self.xp.get(ctx.guild.id, member.id)
         
-        xp = user_data["xp"] or 0
-        level = user_data["level"] or 0
+        xp = user_data["xp"]
+        level = user_data["level"]
         
         next_level_xp = self.get_xp_for_level(level + 1)
         prev_level_xp = self.get_xp_for_level(level)
@@ -159,8 +269,15 @@ class Leveling(commands.Cog):
             color=discord.Color.blue()
         )
         embed.set_thumbnail(url=member.display_avatar.url)
+        board = self.rankings.get(ctx.guild.id)
+        position = board.rank(member.id)
         embed.add_field(name="Level", value=str(level), inline=True)
         embed.add_field(name="Total XP", value=f"{xp}", inline=True)
+        embed.add_field(
+            name="Rank",
+            value=f"#{position} / {len(board)}" if position else "-",
+            inline=True
+        )
         embed.add_field(name="Progress", value=f"{bar_str} {int(percentage)}%", inline=False)
         embed.set_footer(text=f"Next Level at {next_level_xp} XP")
         
@@ -168,42 +285,43 @@ class Leveling(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.hybrid_command(aliases=["top", "lb"])
-    async def leaderboard(self, ctx):
-        """Show top 10 users by XP."""
+    @commands.guild_only()
+    async def leaderboard(self, ctx, page: int = 1):
+        """Show this server's users by XP, 10 per page."""
         if ctx.interaction:
             await ctx.interaction.response.defer()
 
-        top_users = get_top_users(limit=10)
+        board = self.rankings.get(ctx.guild.id)
+        page_count = board.page_count(LEADERBOARD_PAGE_SIZE)
+        page = min(max(page, 1), page_count)
+        top_users = board.page(page, LEADERBOARD_PAGE_SIZE)
         
         if not top_users:
             await ctx.send("Belum ada data leaderboard.")
             return
 
         embed = discord.Embed(
-            title="🏆 Global Leaderboard",
+            title=f"🏆 Leaderboard {ctx.guild.name}",
             color=discord.Color.gold()
         )
         
+        # Resolve every name at once: caches first, then concurrent fetches for the rest
+        names = await self.names.resolve([user_id for _, user_id, _, _ in top_users], ctx.guild)
+        
         desc = ""
-        for i, user in enumerate(top_users):
-            user_id, xp, level = user
-            
-            # Fetch username
-            try:
-                member_obj = await self.bot.fetch_user(int(user_id))
-                name = member_obj.display_name
-            except:
-                name = "Unknown User"
+        for position, user_id, xp, level in top_users:
+            name = names[user_id]
             
             medal = ""
-            if i == 0: medal = "🥇"
-            elif i == 1: medal = "🥈"
-            elif i == 2: medal = "🥉"
-            else: medal = f"#{i+1}"
+            if position == 1: medal = "🥇"
+            elif position == 2: medal = "🥈"
+            elif position == 3: medal = "🥉"
+            else: medal = f"#{position}"
             
             desc += f"**{medal} {name}** — Lvl {level} ({xp} XP)\n"
             
         embed.description = desc
+        embed.set_footer(text=f"Halaman {page}/{page_count} • {len(board)} users")
         await ctx.send(embed=embed)
 
     @commands.hybrid_command()
@@ -248,7 +366,10 @@ class Leveling(commands.Cog):
             return
 
         xp_needed = self.get_xp_for_level(level)
-        update_user_xp(member.id, xp_needed, level)
+        await self.xp_ready.wait()
+        async with self._bulk_lock:
+            await self.xp.get(ctx.guild.id, member.id)  # Cache the row so last_active is kept
+            self.xp.set(ctx.guild.id, member.id, xp_needed, level, active=False)
         
         # Assign only the HIGHEST milestone role the user qualifies for
         highest_milestone = max((m for m in ROLE_REWARDS if m <= level), default=None)
@@ -270,15 +391,17 @@ class Leveling(commands.Cog):
              await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
              return
 
-        user_data = get_user_data(member.id)
-        current_xp = user_data["xp"] or 0
-        current_level = user_data["level"] or 0
-        
-        new_xp = current_xp + amount
-        
-        # Check if this new XP causes a level up
-        import math
-        new_level = int(math.sqrt(new_xp / 100))
+        await self.xp_ready.wait()
+        async with self._bulk_lock:
+            user_data = await self.xp.get(ctx.guild.id, member.id)
+            current_xp = user_data["xp"]
+            current_level = user_data["level"]
+            
+            new_xp = current_xp + amount
+            
+            # Check if this new XP causes a level up
+            new_level = level_for_xp(new_xp)
+            self.xp.set(ctx.guild.id, member.id, new_xp, new_level, active=False)
         
         # Determine if level changed
         if new_level > current_level:
@@ -294,8 +417,6 @@ class Leveling(commands.Cog):
             if highest_milestone and highest_milestone > current_level:
                 await self.check_role_reward(ctx.message, member, highest_milestone)
         
-        update_user_xp(member.id, new_xp, new_level)
-        
         embed = discord.Embed(
             title="🛠️ Admin XP Gift",
             description=f"Berikan **{amount} XP** ke {member.display_name}.\nTotal XP: {new_xp} (Lvl {new_level})",
@@ -303,5 +424,108 @@ class Leveling(commands.Cog):
         )
         await ctx.reply(embed=embed)
 
+    @commands.command()
+    async def xpstats(self, ctx):
+        """Show XP write-behind flush stats (Owner only)."""
+        if ctx.author.id not in ADMIN_IDS:
+            await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
+            return
+
+        latency = metrics.summary("leveling.flush_ms")
+        batch = metrics.summary("leveling.flush_rows")
+        embed = discord.Embed(title="💾 XP Buffer", color=discord.Color.red())
+        embed.add_field(name="Users cached", value=str(len(self.xp.rows)), inline=True)
+        embed.add_field(name="Pending rows", value=str(len(self.xp.dirty)), inline=True)
+        embed.add_field(name="Idle evictions", value=str(self.xp.evictions), inline=True)
+        embed.add_field(name="Flushes", value=str(latency["count"]), inline=True)
+        embed.add_field(
+            name="Flush latency (ms)",
+            value=f"p50 {latency['p50']:.1f} | p95 {latency['p95']:.1f} | max {latency['max']:.1f}",
+            inline=False
+        )
+        embed.add_field(
+            name="Batch size (rows)",
+            value=f"mean {batch['mean']:.1f} | max {batch['max']:.0f}",
+            inline=False
+        )
+        await ctx.reply(embed=embed)
+
+    # BULK ADMIN COMMANDS (whole-server XP table, see utils/xp_bulk.py)
+    @commands.command()
+    @commands.guild_only()
+    async def xprecalc(self, ctx):
+        """Recompute every member's level from their XP (Owner only)."""
+        if ctx.author.id not in ADMIN_IDS:
+            await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
+            return
+
+        (changed, total), elapsed = await self.run_bulk(ctx.guild.id, recalculate_levels)
+        await ctx.reply(f"🛠️ Level dihitung ulang: **{changed}** dari {total} user berubah ({elapsed:.2f}s).")
+
+    @commands.command()
+    @commands.guild_only()
+    async def xpdecay(self, ctx, percent: float, days: int = 30):
+        """Remove percent% XP from members inactive for `days` days (Owner only)."""
+        if ctx.author.id not in ADMIN_IDS:
+            await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
+            return
+        if not 0 < percent <= 100 or days < 0:
+            await ctx.reply("⚠️ Persen harus 0-100 dan hari tidak boleh negatif.")
+            return
+
+        (changed, total), elapsed = await self.run_bulk(
+            ctx.guild.id, decay_xp, percent, days * 86400, int(time.time())
+        )
+        await ctx.reply(
+            f"📉 XP **{changed}** dari {total} user dikurangi {percent:g}% "
+            f"(tidak aktif ≥ {days} hari, {elapsed:.2f}s)."
+        )
+
+    @commands.command()
+    @commands.guild_only()
+    async def xpexport(self, ctx, fmt: str = "csv"):
+        """Download this server's XP table as CSV or Parquet (Owner only)."""
+        if ctx.author.id not in ADMIN_IDS:
+            await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
+            return
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.reply(f"⚠️ Format harus salah satu dari: {', '.join(EXPORT_FORMATS)}")
+            return
+
+        await self.xp.flush()
+        try:
+            data = await db.run(export_xp, ctx.guild.id, fmt)
+        except ImportError as e:
+            await ctx.reply(f"⚠️ Export {fmt} tidak tersedia: {e}")
+            return
+        file = discord.File(io.BytesIO(data), filename=f"xp_{ctx.guild.id}.{fmt}")
+        await ctx.reply("📦 Export XP server ini:", file=file)
+
+    @commands.command()
+    @commands.guild_only()
+    async def xpimport(self, ctx):
+        """Replace members' XP from an attached CSV/Parquet file with user_id and xp columns (Owner only)."""
+        if ctx.author.id not in ADMIN_IDS:
+            await ctx.reply("⛔ **Akses Ditolak!** Command ini khusus Owner.")
+            return
+        if not ctx.message.attachments:
+            await ctx.reply("⚠️ Lampirkan file .csv atau .parquet (kolom: user_id, xp).")
+            return
+
+        attachment = ctx.message.attachments[0]
+        fmt = attachment.filename.rsplit(".", 1)[-1].lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.reply(f"⚠️ Format harus salah satu dari: {', '.join(EXPORT_FORMATS)}")
+            return
+
+        data = await attachment.read()
+        try:
+            count, elapsed = await self.run_bulk(ctx.guild.id, import_xp, data, fmt)
+        except (ImportError, ValueError) as e:
+            await ctx.reply(f"⚠️ Import gagal: {e}")
+            return
+        await ctx.reply(f"📥 Import selesai: **{count}** user ({elapsed:.2f}s). Level dihitung dari XP.")
+
 async def setup(bot):
     await bot.add_cog(Leveling(bot))
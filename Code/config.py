@@ -35,6 +35,55 @@ intents.voice_states = True
 # Command Prefix
 COMMAND_PREFIX = "!"
 
+# ============================================================================
+# AI API SETTINGS
+# ============================================================================
+# Chat backend: "botcahx" (AI_API_URL / AI_API_KEY), "openai" (any
+# OpenAI-compatible chat completions API) or "mock" (offline, canned replies)
+AI_BACKEND = os.getenv("AI_BACKEND", "botcahx").lower()
+OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+AI_MOCK_LATENCY_SECONDS = float(os.getenv("AI_MOCK_LATENCY_SECONDS", "0.5"))
+
+# How the prompt is sent: "get" (query string, botcahx default) or
+# "post" (JSON body, for backends that accept it; no URL length limit)
+AI_API_TRANSPORT = os.getenv("AI_API_TRANSPORT", "get").lower()
+AI_REQUEST_TIMEOUT_SECONDS = 60
+AI_MAX_CONNECTIONS = 20
+
+# Conversation memory: messages kept per user, total budget across all users,
+# idle time before a user's history is dropped from memory, and the optional
+# SQLite file that keeps history across restarts (empty to disable)
+AI_CONVERSATION_TURNS = 10
+AI_MEMORY_BUDGET_BYTES = 4 * 1024 * 1024
+AI_CONVERSATION_IDLE_SECONDS = 6 * 60 * 60
+AI_CONVERSATION_DB = os.getenv("AI_CONVERSATION_DB", "data/conversations.db")
+
+# Prompt budget for conversation context: the summary line plus the newest
+# turns verbatim fit in AI_CONTEXT_BUDGET_CHARS in total (an oversized newest
+# turn is truncated). Older turns are compacted into a summary that keeps at
+# most AI_SUMMARY_BUDGET_CHARS (the GET transport puts the whole prompt in the URL)
+AI_CONTEXT_BUDGET_CHARS = 3000
+AI_SUMMARY_BUDGET_CHARS = 600
+
+# Cached replies for stateless prompts (!ai and mentions without memory)
+AI_RESPONSE_CACHE_SIZE = 256
+AI_RESPONSE_CACHE_TTL = 10 * 60  # seconds
+
+# AI request scheduler: concurrent upstream calls, waiting requests before
+# new ones are turned away, and optional per-guild weights {guild_id: weight}
+AI_MAX_CONCURRENT_REQUESTS = 4
+AI_MAX_QUEUE_DEPTH = 50
+AI_GUILD_WEIGHTS = {}
+
+# ============================================================================
+# LEVELING SETTINGS
+# ============================================================================
+# XP is stored per server. XP from before that change was global; it is moved
+# into this server (defaults to the bot's only server, if it is in just one)
+LEVELING_LEGACY_GUILD_ID = int(os.getenv("LEVELING_LEGACY_GUILD_ID", "0")) or None
+
 # ============================================================================
 # FEATURE COOLDOWNS (in minutes)
 # ============================================================================
@@ -22,6 +22,7 @@ if sys.platform.startswith("win"):
 from discord.ext import commands
 from logger import export_log_to_excel
 from config import BOT_TOKEN, COMMAND_PREFIX, intents, keyword_responses
+from utils.reply_renderer import send_ai_reply
 
 
 # ============================================================================
@@ -58,19 +59,12 @@ async def on_message(message):
         if user_message:
             ai_cog = bot.get_cog("AI")
             if ai_cog:
-                response = await ai_cog.get_ai_response(user_message)
-            else:
-                response = None
-            if response:
-                if isinstance(response, dict):
-                    if response.get("text"):
-                        await message.reply(response["text"])
-                    if response.get("image"):
-                        embed = discord.Embed(color=discord.Color.blue())
-                        embed.set_image(url=response["image"])
-                        await message.channel.send(embed=embed)
-                else:
-                    await message.reply(response)
+                response = await ai_cog.get_ai_response(
+                    user_message,
+                    guild_id=message.guild.id if message.guild else None,
+                    requester_id=message.author.id
+                )
+                await send_ai_reply(message, response)
         return
 
     # Handle replies to bot messages (e.g. replying to an embed the bot sent)
@@ -85,17 +79,11 @@ async def on_message(message):
     ):
         user_message = message.content.strip()
         if user_message and not user_message.startswith(COMMAND_PREFIX):
-            response = await ai_cog.get_ai_response(user_message, message.author.id, use_memory=True)
-            if response:
-                if isinstance(response, dict):
-                    if response.get("text"):
-                        await message.reply(response["text"])
-                    if response.get("image"):
-                        embed = discord.Embed(color=discord.Color.blue())
-                        embed.set_image(url=response["image"])
-                        await message.channel.send(embed=embed)
-                else:
-                    await message.reply(response)
+            response = await ai_cog.get_ai_response(
+                user_message, message.author.id, use_memory=True,
+                guild_id=message.guild.id if message.guild else None
+            )
+            await send_ai_reply(message, response)
         return
 
     # Handle auto-AI mode (from AI Cog)
@@ -108,23 +96,11 @@ async def on_message(message):
             return
             
         # Get AI response
-        response = await ai_cog.get_ai_response(user_message, message.author.id, use_memory=True)
-        if response:
-            if isinstance(response, dict):
-                text = response.get("text")
-                image = response.get("image")
-                
-                # Send text first as regular message
-                if text:
-                    await message.reply(text)
-                
-                # Send image as embed if available
-                if image:
-                    embed = discord.Embed(color=discord.Color.blue())
-                    embed.set_image(url=image)
-                    await message.channel.send(embed=embed)
-            else:
-                await message.reply(response)
+        response = await ai_cog.get_ai_response(
+            user_message, message.author.id, use_memory=True,
+            guild_id=message.guild.id if message.guild else None
+        )
+        await send_ai_reply(message, response)
         return
 
     # Handle keyword responses (only if exact match)
@@ -179,13 +155,13 @@ async def help(ctx):
     embed.add_field(name="💖 **Waifu**", value="`!my`: Random waifu info (CD: 5m)\n`!gen <desc>`: Generate anime art (CD: 10m)", inline=False)
     
     # Leveling System
-    embed.add_field(name="� **Leveling**", value="`!rank`: Cek Level & XP\n`!leaderboard`: Top 10 users\n`!roles`: List role rewards", inline=False)
+    embed.add_field(name="� **Leveling**", value="`!rank`: Cek Level, XP & Rank\n`!leaderboard [page]`: Top users (10 per page)\n`!roles`: List role rewards", inline=False)
 
     # Anime & Fun
     embed.add_field(name="🎬 **Anime & Fun**", value="`!anime <judul>`: Cari info anime\n`!recommend`: Rekomendasi anime random\n`!valrank`: Cek rank Valorant (Fun)", inline=False)
 
     # Admin (Owner Only)
-    embed.add_field(name="🛠️ **Admin/Owner**", value="`!setlevel @user <lvl>`: Set level manual\n`!addxp @user <amount>`: Tambah XP manual", inline=False)
+    embed.add_field(name="🛠️ **Admin/Owner**", value="`!setlevel @user <lvl>`: Set level manual\n`!addxp @user <amount>`: Tambah XP manual\n`!xprecalc`: Hitung ulang semua level\n`!xpdecay <persen> [hari]`: Kurangi XP user tidak aktif\n`!xpexport [csv/parquet]` / `!xpimport`: Export/Import XP", inline=False)
 
     embed.set_footer(text="Shirokane Bot v2.0 - Leveling System Added!")
     
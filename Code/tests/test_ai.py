@@ -0,0 +1,89 @@
+"""
+AI Cog Tests
+Prompt assembly and upstream calls of AI.get_ai_response, with the AI
+backend and Bestdori lookups stubbed.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import commands.ai as ai_module
+from commands.ai import AI
+
+NOT_FOUND = "Tidak ditemukan kartu"
+CALLERS = 50
+
+
+class AITestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # No conversation database on disk
+        with mock.patch.object(ai_module, "AI_CONVERSATION_DB", None):
+            self.cog = AI(bot=None)
+        self.prompts = []
+
+        async def request_ai(prompt):
+            self.prompts.append(prompt)
+            return "ano... baik"
+
+        self.cog.request_ai = request_ai
+
+    def patch_cards(self, character_cards=(), band_cards=()):
+        character = mock.AsyncMock(return_value=list(character_cards))
+        band = mock.AsyncMock(return_value=list(band_cards))
+        for name, stub in (("get_character_cards", character), ("get_band_cards", band)):
+            patcher = mock.patch.object(ai_module, name, stub)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return character, band
+
+
+class CardContextTest(AITestCase):
+    async def test_known_character_is_looked_up(self):
+        character, _ = self.patch_cards()
+        await self.cog.get_ai_response("kartu tomori terbaru")
+        self.assertEqual(character.await_args.args[0], "tomori")
+
+    async def test_character_without_id_gets_no_card_context(self):
+        character, band = self.patch_cards()
+        for query in ("kartu sakiko", "kartu mutsumi terbaru", "kartu ave mujica"):
+            with self.subTest(query=query):
+                self.prompts.clear()
+                await self.cog.get_ai_response(query)
+                self.assertNotIn(NOT_FOUND, self.prompts[0])
+        character.assert_not_awaited()
+        band.assert_not_awaited()
+
+
+class UpstreamCoalescingTest(AITestCase):
+    async def test_concurrent_identical_prompts_make_one_request(self):
+        release = asyncio.Event()
+
+        async def request_ai(prompt):
+            self.prompts.append(prompt)
+            await release.wait()
+            return "ano... halo juga"
+
+        self.cog.request_ai = request_ai
+        callers = [
+            asyncio.create_task(self.cog.get_ai_response("halo rinko", guild_id=1, requester_id=user_id))
+            for user_id in range(CALLERS)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*callers)
+
+        self.assertEqual(len(self.prompts), 1)
+        self.assertEqual(results, [{"text": "ano... halo juga"}] * CALLERS)
+        self.assertEqual(self.cog.upstream.started, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Bestdori Index Update Tests
+Indexes patched in place with a refresh diff answer every query the same
+as indexes rebuilt from the new dataset.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bestdori import DatasetDiff
+from utils.bestdori_index import (
+    LONG_RUNNING_MS, SERVER_COUNT, CardIndex, EventTimeline, GachaIndex,
+    project_card, project_event, project_gacha,
+)
+
+DAY_MS = 24 * 60 * 60 * 1000
+START_MS = 1_600_000_000_000
+ROUNDS = 20
+
+
+def random_card(rng, card_id):
+    return project_card(card_id, {
+        "characterId": rng.randint(1, 40),
+        "prefix": [f"card {card_id}"],
+        "rarity": rng.randint(1, 5),
+        "type": rng.choice(["permanent", "limited", "dreamfes", "kirafes", "birthday"]),
+        "attribute": rng.choice(["cool", "pure", "happy", "powerful"]),
+        "releasedAt": [str(START_MS + rng.randint(0, 50) * DAY_MS)],
+    })
+
+
+def random_schedule(rng):
+    starts, ends = [], []
+    for server in range(SERVER_COUNT):
+        if server and rng.random() < 0.3:
+            starts.append(None)
+            ends.append(None)
+            continue
+        start = START_MS + rng.randint(0, 50) * DAY_MS
+        length = LONG_RUNNING_MS + DAY_MS if rng.random() < 0.1 else rng.randint(1, 10) * DAY_MS
+        starts.append(str(start))
+        ends.append(str(start + length))
+    return starts, ends
+
+
+def random_event(rng, event_id):
+    starts, ends = random_schedule(rng)
+    return project_event(event_id, {"eventName": [f"event {event_id}"], "startAt": starts, "endAt": ends})
+
+
+def random_gacha(rng, gacha_id):
+    starts, ends = random_schedule(rng)
+    return project_gacha(gacha_id, {
+        "gachaName": [f"gacha {gacha_id}"],
+        "publishedAt": starts,
+        "closedAt": ends,
+        "newCards": rng.sample(range(1, 60), rng.randint(0, 3)),
+    })
+
+
+def mutate(rng, data, make, next_id):
+    """A new version of data with a few records added, changed and removed."""
+    new = dict(data)
+    for record_id in rng.sample(sorted(new), min(len(new), 5)):
+        if rng.random() < 0.5:
+            del new[record_id]
+        else:
+            new[record_id] = make(rng, record_id)
+    for record_id in range(next_id, next_id + rng.randint(0, 5)):
+        new[str(record_id)] = make(rng, record_id)
+    return new
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def assert_updates_match_rebuild(self, make, build, check):
+        rng = random.Random(8)
+        data = {str(i): make(rng, i) for i in range(60)}
+        index = build(data)
+        next_id = 60
+        for _ in range(ROUNDS):
+            new = mutate(rng, data, make, next_id)
+            next_id += 5
+            index.update(new, DatasetDiff.between(data, new))
+            data = new
+            check(index, build(data), rng)
+
+    def test_card_index(self):
+        def check(updated, rebuilt, rng):
+            self.assertEqual(len(updated.columns), len(rebuilt.columns))
+            for band_ids in ({1}, {5, 45}, None):
+                for min_rarity in (None, 4):
+                    criteria = {"band_ids": band_ids, "min_rarity": min_rarity, "attributes": {"cool", "pure"}}
+                    self.assertEqual(
+                        sorted(ids(updated.search(**criteria))), sorted(ids(rebuilt.search(**criteria)))
+                    )
+            characters = rng.sample(range(1, 41), 3)
+            self.assertEqual(
+                [c["released"] for c in updated.newest(characters, limit=10)],
+                [c["released"] for c in rebuilt.newest(characters, limit=10)],
+            )
+
+        self.assert_updates_match_rebuild(random_card, CardIndex, check)
+
+    def check_timeline(self, updated, rebuilt, rng):
+        for server in range(SERVER_COUNT):
+            self.assertEqual(len(updated.servers[server]), len(rebuilt.servers[server]))
+            self.assertEqual(updated.servers[server].max_end, rebuilt.servers[server].max_end)
+            for _ in range(5):
+                t = START_MS + rng.randint(0, 60) * DAY_MS
+                self.assertEqual(sorted(ids(updated.active_at(t, server))), sorted(ids(rebuilt.active_at(t, server))))
+                self.assertEqual(
+                    sorted(ids(updated.starting_between(t, t + 7 * DAY_MS, server))),
+                    sorted(ids(rebuilt.starting_between(t, t + 7 * DAY_MS, server))),
+                )
+                updated_next = updated.next_after(t, server)
+                rebuilt_next = rebuilt.next_after(t, server)
+                self.assertEqual(updated_next and updated_next["start"], rebuilt_next and rebuilt_next["start"])
+
+    def test_event_timeline(self):
+        self.assert_updates_match_rebuild(random_event, EventTimeline, self.check_timeline)
+
+    def test_gacha_index(self):
+        def check(updated, rebuilt, rng):
+            self.check_timeline(updated, rebuilt, rng)
+            self.assertEqual(updated.cards_by_gacha, rebuilt.cards_by_gacha)
+            for card_id, gacha_ids in rebuilt.gachas_by_card.items():
+                # Ties on JP start may be ordered either way
+                featured = updated.gachas_by_card[card_id]
+                self.assertEqual(sorted(featured), sorted(gacha_ids))
+                starts = [updated.by_id[g]["starts"][0] or 0 for g in featured]
+                self.assertEqual(starts, sorted(starts))
+            self.assertEqual(set(updated.gachas_by_card), set(rebuilt.gachas_by_card))
+
+        self.assert_updates_match_rebuild(random_gacha, GachaIndex, check)
+
+
+if __name__ == "__main__":
+    unittest.main()
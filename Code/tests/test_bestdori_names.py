@@ -0,0 +1,92 @@
+"""
+Bestdori Name Index Tests
+Fuzzy name resolution against everyday chat: typos of real names resolve,
+ordinary words never pull in another character's cards.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.intent_router_benchmark import SAMPLE_CORPUS
+from commands.ai import FUZZY_NAME_CONFIDENCE
+from utils.bestdori import resolve_name
+
+# Chat lines that mention no character or band
+NAMELESS_CHAT = [
+    "ada kartu baru yang masuk?",
+    "kartu player terbaik",
+    "kartu later aja",
+    "kartu yang masuknya kapan",
+    "layar hp aku retak",
+    "kartu paling mahal apa",
+    "aku lagi asking temen soal kartu",
+    "making progress di event kemarin",
+    "kartu bagus buat pemula",
+    "ada kartu gratis ga minggu ini",
+    "kartu terbaru siapa ya",
+    "kartu limited kemarin keren banget",
+    "kamu main gacha ga hari ini",
+    "kartu apa yang paling langka",
+    "best player di server ini siapa",
+    "nanti aja kartu nya later",
+    "kartu yang ada di banner",
+    "kalau main multi live pakai kartu apa",
+]
+
+TYPOS = {
+    "yukinaa": "yukina",
+    "kartu rinkoo": "rinko",
+    "kartu kasumii terbaru": "kasumi",
+    "sayoo card": "sayo",
+    "kartu rinkoooo": "rinko",
+    "kartu tsugumii": "tsugumi",
+    "kartu mashro": "mashiro",
+    "kartu chisatoo terbaru": "chisato",
+    "kartu morfonika": "morfonica",
+    "kartu hikawa sayoo": "sayo",
+}
+
+
+class NameResolutionTest(unittest.TestCase):
+    def assert_no_fuzzy_hit(self, line):
+        match = resolve_name(line.lower())
+        if match and match.confidence < 1.0:
+            self.assertLess(match.confidence, FUZZY_NAME_CONFIDENCE, f"{line!r} → {match}")
+
+    def test_nameless_chat_does_not_match(self):
+        for line in NAMELESS_CHAT:
+            with self.subTest(line=line):
+                match = resolve_name(line.lower())
+                if match is not None:
+                    self.assertLess(match.confidence, FUZZY_NAME_CONFIDENCE, f"{line!r} → {match}")
+
+    def test_chat_corpus_has_no_fuzzy_hits(self):
+        # Names in the corpus are spelled correctly, so any accepted match must be exact
+        for line in SAMPLE_CORPUS:
+            with self.subTest(line=line):
+                self.assert_no_fuzzy_hit(line)
+
+    def test_typos_of_long_names_resolve(self):
+        for line, name in TYPOS.items():
+            with self.subTest(line=line):
+                match = resolve_name(line)
+                self.assertIsNotNone(match)
+                self.assertEqual(match.name, name)
+                self.assertGreaterEqual(match.confidence, FUZZY_NAME_CONFIDENCE)
+
+    def test_short_aliases_only_tolerate_stretched_endings(self):
+        self.assertEqual(resolve_name("kartu layer").name, "layer")
+        for line in ("kartu rinka", "kartu rnko", "kartu yukna", "kartu sayu"):
+            with self.subTest(line=line):
+                match = resolve_name(line)
+                self.assertTrue(match is None or match.confidence < FUZZY_NAME_CONFIDENCE, f"{line!r} → {match}")
+
+
+if __name__ == "__main__":
+    unittest.main()
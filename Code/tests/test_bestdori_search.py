@@ -0,0 +1,72 @@
+"""
+Bestdori Card Search Tests
+search_cards filters bands on the band_id column and finds nothing for
+names it cannot map to an ID.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.bestdori as bestdori
+from utils.bestdori_index import CardIndex, project_cards
+
+# Two cards per character for Roselia (21-25) and MyGO!!!!! (36-40)
+RAW_CARDS = {
+    str(character_id * 10 + n): {
+        "characterId": character_id,
+        "prefix": [f"card {character_id}-{n}"],
+        "rarity": 3 + n,
+        "type": "permanent",
+        "attribute": "cool",
+        "resourceSetName": f"res{character_id:03d}{n:03d}",
+        "releasedAt": [str(1_600_000_000_000 + character_id * 1000 + n)],
+    }
+    for character_id in list(range(21, 26)) + list(range(36, 41))
+    for n in range(2)
+}
+
+
+class SearchCardsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.index = CardIndex(project_cards(RAW_CARDS))
+
+        async def get_index(name):
+            return self.index
+
+        patcher = mock.patch.object(bestdori.client, "get_index", get_index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def search_ids(self, **criteria):
+        return {card["id"] for card in await bestdori.search_cards(limit=100, **criteria)}
+
+    async def test_band_filter_uses_band_ids(self):
+        mygo = await self.search_ids(band_name="mygo")
+        self.assertEqual(len(mygo), 10)
+        self.assertTrue(all(360 <= int(card_id) < 410 for card_id in mygo))
+        self.assertEqual(len(await self.search_ids(band_name="Roselia")), 10)
+
+    async def test_band_and_character_intersect(self):
+        self.assertEqual(await self.search_ids(band_name="roselia", character_name="rinko"), {"250", "251"})
+        self.assertEqual(await self.search_ids(band_name="mygo", character_name="rinko"), set())
+
+    async def test_unmapped_names_find_nothing(self):
+        for criteria in ({"character_name": "sakiko"}, {"band_name": "ave mujica"}, {"band_name": "unknown"}):
+            with self.subTest(**criteria):
+                self.assertEqual(await bestdori.search_cards(**criteria), [])
+
+    async def test_results_are_the_index_records(self):
+        cards = self.index.search(band_ids={45}, limit=3)
+        self.assertEqual([card["id"] for card in cards], ["401", "400", "391"])
+        self.assertIs(cards[0], self.index.by_id["401"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Conversation Store Tests
+context() stays within context_budget, summary line included.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.conversation_store import ROLE_AI, ROLE_USER, ConversationStore
+
+# ai.py joins context lines with a two-character "\\n"
+SEPARATOR = "\\n"
+
+
+class ContextBudgetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_summary_counts_against_budget(self):
+        store = ConversationStore(max_turns=4, context_budget=500, summary_budget=300)
+        for turn in range(20):
+            await store.append(1, ROLE_USER, f"pertanyaan {turn} " + "x" * 40)
+            await store.append(1, ROLE_AI, f"jawaban {turn} " + "y" * 40)
+
+        lines = await store.context(1)
+        self.assertTrue(lines[0].startswith("[Ringkasan"))
+        self.assertLessEqual(len(SEPARATOR.join(lines)), 500)
+        self.assertTrue(lines[-1].startswith("AI: jawaban 19"))
+
+    async def test_oversized_newest_turn_is_truncated(self):
+        store = ConversationStore(context_budget=300)
+        await store.append(1, ROLE_USER, "halo")
+        await store.append(1, ROLE_USER, "z" * 5000)
+
+        lines = await store.context(1)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith("User: zzz"))
+        self.assertLessEqual(len(SEPARATOR.join(lines)), 300)
+        # History itself keeps the full text
+        self.assertEqual(len((await store.history(1))[-1]), len("User: ") + 5000)
+
+
+class ConcurrentLoadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_first_messages_keep_both_turns(self):
+        store = ConversationStore(db_path=os.path.join(tempfile.mkdtemp(), "conversations.db"))
+        self.addCleanup(store.close)
+        await asyncio.gather(store.append(1, ROLE_USER, "first"), store.append(1, ROLE_USER, "second"))
+
+        self.assertEqual(sorted(await store.history(1)), ["User: first", "User: second"])
+        self.assertEqual(store.size, store.users[1].size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Leveling Bulk Operation Tests
+Bulk XP operations run one at a time with the guild's XP gains paused, and
+writes based on pre-operation data never overwrite the result.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import commands.leveling as leveling
+import utils.xp_buffer as xp_buffer
+from utils.database import Database
+
+GUILD_ID = 1
+USER_ID = 42
+
+
+def set_xp(conn, guild_id, xp):
+    with conn:
+        conn.execute("UPDATE guild_users SET xp = ? WHERE guild_id = ?", (xp, str(guild_id)))
+
+
+def fake_message(guild_id, user_id):
+    async def send(*args, **kwargs):
+        pass
+
+    author = SimpleNamespace(id=user_id, bot=False, mention=f"<@{user_id}>")
+    return SimpleNamespace(author=author, guild=SimpleNamespace(id=guild_id), channel=SimpleNamespace(send=send))
+
+
+class BulkOperationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = Database(os.path.join(tempfile.mkdtemp(), "leveling.db"))
+        for module in (leveling, xp_buffer):
+            patcher = mock.patch.object(module, "db", self.db)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        await self.db.initialize()
+        await self.db.get_user_data(GUILD_ID, USER_ID)
+
+        self.cog = leveling.Leveling(bot=None)
+        self.cog.xp_ready.set()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    async def test_operations_do_not_overlap(self):
+        seen = []
+
+        def operation(conn, guild_id, xp):
+            # Runs on the database thread: record whether XP gains were paused for it
+            seen.append(self.cog.bulk_guild_id)
+            set_xp(conn, guild_id, xp)
+            return xp
+
+        results = await asyncio.gather(
+            self.cog.run_bulk(GUILD_ID, operation, 100),
+            self.cog.run_bulk(GUILD_ID, operation, 200),
+        )
+        self.assertEqual([result for result, _ in results], [100, 200])
+        self.assertEqual(seen, [GUILD_ID, GUILD_ID])
+        self.assertIsNone(self.cog.bulk_guild_id)
+
+    async def test_in_flight_gain_does_not_undo_operation(self):
+        # The message's read is queued before the bulk operation starts
+        gain = asyncio.create_task(self.cog.on_message(fake_message(GUILD_ID, USER_ID)))
+        await asyncio.sleep(0)
+        await self.cog.run_bulk(GUILD_ID, set_xp, 5000)
+        await gain
+
+        self.assertFalse(self.cog.xp.dirty)
+        self.assertEqual((await self.cog.xp.get(GUILD_ID, USER_ID))["xp"], 5000)
+        self.assertEqual(self.cog.rankings.get(GUILD_ID).users[USER_ID][0], 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
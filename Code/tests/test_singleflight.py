@@ -0,0 +1,123 @@
+"""
+Single-Flight Tests
+N concurrent callers with the same key reach the upstream exactly once.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bestdori import BestdoriClient, CachedDataset
+from utils.singleflight import SingleFlight
+
+CALLERS = 50
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_run_factory_once(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        callers = [asyncio.create_task(flight.do("key", factory)) for _ in range(CALLERS)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, ["result"] * CALLERS)
+        self.assertEqual(flight.started, 1)
+        self.assertEqual(flight.shared, CALLERS - 1)
+
+    async def test_cancelled_caller_does_not_cancel_shared_task(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def factory():
+            await release.wait()
+            return "result"
+
+        first = asyncio.create_task(flight.do("key", factory))
+        second = asyncio.create_task(flight.do("key", factory))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        release.set()
+        self.assertEqual(await second, "result")
+
+    async def test_key_dropped_when_task_finishes(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        self.assertEqual(await flight.do("key", factory), 1)
+        await asyncio.sleep(0)  # Let the done callback run
+        self.assertNotIn("key", flight)
+        # Nothing is cached: the next call starts a new task
+        self.assertEqual(await flight.do("key", factory), 2)
+
+
+class FakeResponse:
+    def __init__(self, release):
+        self.status = 304
+        self.release = release
+
+    async def __aenter__(self):
+        await self.release.wait()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = 0
+        self.release = asyncio.Event()
+
+    def get(self, url, headers=None):
+        self.requests += 1
+        return FakeResponse(self.release)
+
+
+class BestdoriRefreshTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_refreshes_share_one_request(self):
+        client = BestdoriClient()
+        session = FakeSession()
+
+        async def get_session():
+            return session
+
+        client._get_session = get_session
+        # A cached copy with a validator, so the 304 path is taken and nothing touches disk
+        client._cache["events"] = CachedDataset({"1": {"id": 1}}, etag='"v1"')
+
+        callers = [asyncio.create_task(client.refresh("events")) for _ in range(CALLERS)]
+        await asyncio.sleep(0)
+        session.release.set()
+        results = await asyncio.gather(*callers)
+
+        self.assertEqual(session.requests, 1)
+        self.assertEqual(results, [{"1": {"id": 1}}] * CALLERS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+XP Buffer Tests
+Flushed rows are evicted once idle; unflushed rows never are.
+
+Run (from the Code directory):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.xp_buffer as xp_buffer
+from utils.xp_buffer import XPBuffer
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.written = []
+
+    async def update_users_xp(self, rows):
+        self.written.extend(rows)
+
+    async def get_user_data(self, guild_id, user_id):
+        return {"xp": 0, "level": 0, "last_active": 0}
+
+
+class IdleEvictionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = FakeDatabase()
+        patcher = mock.patch.object(xp_buffer, "db", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_flushed_idle_rows_are_evicted(self):
+        buffer = XPBuffer(idle_seconds=60)
+        for user_id in range(3):
+            buffer.set(1, user_id, 100, 1)
+        await buffer.flush()
+        self.assertEqual(len(self.db.written), 3)
+        self.assertEqual(len(self.db.written[0]), 5)  # guild, user, xp, level, last_active
+
+        # Users 0 and 1 went quiet; user 2 is still chatting, user 1 has an unflushed change
+        for key in ((1, 0), (1, 1)):
+            buffer.rows[key][3] = time.monotonic() - 120
+        buffer.rows.move_to_end((1, 2))
+        buffer.dirty.add((1, 1))
+        buffer.evict_idle()
+
+        self.assertEqual(set(buffer.rows), {(1, 1), (1, 2)})
+        self.assertEqual(buffer.evictions, 1)
+
+    async def test_evicted_row_is_read_again(self):
+        buffer = XPBuffer(idle_seconds=0)
+        buffer.set(1, 5, 400, 2)
+        await buffer.flush()
+        buffer.evict_idle()
+        self.assertNotIn((1, 5), buffer.rows)
+        self.assertEqual(await buffer.get(1, 5), {"xp": 0, "level": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+AI Backends
+Interchangeable chat backends for the AI cog: botcahx, any OpenAI-compatible
+chat completions API, and a local mock. Selected with AI_BACKEND.
+"""
+
+import asyncio
+import random
+
+
+class AIBackend:
+    """
+    A backend turns a prompt into reply text over the cog's shared aiohttp session.
+    complete() returns None when the API answers but reports failure, and
+    raises on transport errors.
+    """
+
+    name = "base"
+
+    async def complete(self, session, prompt):
+        raise NotImplementedError
+
+
+class BotcahxBackend(AIBackend):
+    """botcahx blackbox-chat: {"text", "apikey"} in, {"status", "message"} out."""
+
+    name = "botcahx"
+
+    def __init__(self, url, api_key, transport="get"):
+        self.url = url
+        self.api_key = api_key
+        self.transport = transport
+
+    async def complete(self, session, prompt):
+        payload = {"text": prompt, "apikey": self.api_key}
+        if self.transport == "post":
+            # JSON body, for deployments that accept it; no URL length limit
+            request = session.post(self.url, json=payload)
+        else:
+            request = session.get(self.url, params=payload)
+
+        async with request as resp:
+            data = await resp.json(content_type=None)
+        if not data.get("status"):
+            return None
+        return data.get("message")
+
+
+class OpenAICompatibleBackend(AIBackend):
+    """POST {base_url}/chat/completions with a single user message."""
+
+    name = "openai"
+
+    def __init__(self, base_url, api_key, model):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.model = model
+
+    async def complete(self, session, prompt):
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
+        async with session.post(self.url, json=payload, headers=headers) as resp:
+            if resp.status != 200:
+                print(f"[AI ERROR] {self.name}: HTTP {resp.status}")
+                return None
+            data = await resp.json(content_type=None)
+        choices = data.get("choices") or []
+        if not choices:
+            return None
+        return choices[0].get("message", {}).get("content")
+
+
+class MockBackend(AIBackend):
+    """Offline backend for development: canned reply after a simulated delay, no network."""
+
+    name = "mock"
+
+    def __init__(self, latency=0.0, error_rate=0.0, reply="Ano... ini balasan uji coba dari Rinko."):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.reply = reply
+
+    async def complete(self, session, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return None
+        return self.reply
+
+
+def create_backend(name, **settings):
+    """
+    Build the backend named by AI_BACKEND ("botcahx", "openai" or "mock").
+    `settings` are the keyword arguments for that backend's constructor.
+    """
+    backends = {
+        BotcahxBackend.name: BotcahxBackend,
+        OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+        MockBackend.name: MockBackend,
+    }
+    if name not in backends:
+        raise ValueError(f"Unknown AI backend {name!r} (expected one of: {', '.join(backends)})")
+    return backends[name](**settings)
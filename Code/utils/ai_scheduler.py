@@ -0,0 +1,132 @@
+"""
+AI Request Scheduler
+Caps concurrent AI API calls and hands out free slots with weighted fair
+queuing across guilds (and users within a guild), shedding load when full.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+
+class SchedulerFull(Exception):
+    """Raised when the wait queue is at its configured depth."""
+
+
+class FairScheduler:
+    """
+    Weighted fair queuing over flows keyed by (guild, user).
+
+    Each waiting request gets a virtual finish tag
+        tag = max(virtual_time, last_tag[flow]) + active_users_in_guild / guild_weight
+    and free slots go to the smallest tag. A guild's share is split between its
+    active users, so one guild with many auto-AI users gets the same total share
+    as a guild with one (scaled by its weight). DMs count as their own guild.
+    """
+
+    def __init__(self, max_concurrency=4, max_queue=50, guild_weights=None, on_wait=None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.guild_weights = guild_weights or {}
+        self.on_wait = on_wait  # callback(wait_seconds) when a request gets a slot
+
+        self.active = 0
+        self.virtual_time = 0.0
+        self.heap = []            # [(tag, seq, future, flow)]
+        self.last_tag = {}        # {flow: tag}
+        self.guild_users = {}     # {guild: {user: pending or running requests}}
+        self.seq = itertools.count()
+        self.waiting = 0
+        self.max_depth = 0
+        self.shed = 0
+
+    @staticmethod
+    def flow_key(guild_id, user_id):
+        return (guild_id if guild_id is not None else ("dm", user_id), user_id)
+
+    @asynccontextmanager
+    async def slot(self, guild_id, user_id):
+        """Hold one of the max_concurrency slots for the duration of the block."""
+        flow = self.flow_key(guild_id, user_id)
+        await self._acquire(flow)
+        try:
+            yield
+        finally:
+            self._release(flow)
+
+    async def _acquire(self, flow):
+        self._track(flow, 1)
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            self._record_wait(0.0)
+            return
+
+        if self.waiting >= self.max_queue:
+            self._track(flow, -1)
+            self.shed += 1
+            raise SchedulerFull()
+
+        guild, user = flow
+        weight = self.guild_weights.get(guild, 1)
+        tag = max(self.virtual_time, self.last_tag.get(flow, 0.0)) + len(self.guild_users[guild]) / weight
+        self.last_tag[flow] = tag
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.heap, (tag, next(self.seq), future, flow))
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Got a slot just as we were cancelled: pass it on
+                self._release(flow)
+            else:
+                self.waiting -= 1
+                self._track(flow, -1)
+            raise
+        self._record_wait(time.perf_counter() - queued_at)
+
+    def _release(self, flow):
+        self._track(flow, -1)
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.heap and self.active < self.max_concurrency:
+            tag, _, future, _ = heapq.heappop(self.heap)
+            if future.cancelled():
+                continue
+            self.waiting -= 1
+            self.virtual_time = tag
+            self.active += 1
+            future.set_result(None)
+
+    def _track(self, flow, delta):
+        """Count a flow's outstanding requests so per-guild shares follow active users."""
+        guild, user = flow
+        users = self.guild_users.setdefault(guild, {})
+        count = users.get(user, 0) + delta
+        if count > 0:
+            users[user] = count
+            return
+        users.pop(user, None)
+        if not users:
+            del self.guild_users[guild]
+        # Idle flows start over from the current virtual time
+        self.last_tag.pop(flow, None)
+
+    def _record_wait(self, seconds):
+        if self.on_wait:
+            self.on_wait(seconds)
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "queued": self.waiting,
+            "max_queued": self.max_depth,
+            "shed": self.shed,
+        }
@@ -1,6 +1,18 @@
-import requests
+"""
+Bestdori API Utility
+Async, cached access to the Bestdori (BanG Dream!) datasets.
+"""
+
+import aiohttp
+import asyncio
 import time
-import random
+from utils.bestdori_assets import CardAssetCache, VARIANT_NORMAL, VARIANT_TRAINED
+from utils.bestdori_columns import band_for_character
+from utils.bestdori_index import CardIndex, EventTimeline, GachaIndex, SERVER_JP, project_card, project_event, project_gacha
+from utils.bestdori_names import NameIndex
+from utils.bestdori_snapshot import load_snapshot, save_snapshot
+from utils.bestdori_stream import StreamingProjector
+from utils.singleflight import SingleFlight
 
 # Bestdori API Endpoints
 API_EVENTS = "https://bestdori.com/api/events/all.5.json"
@@ -8,75 +20,458 @@ API_CARDS = "https://bestdori.com/api/cards/all.5.json"
 API_GACHA = "https://bestdori.com/api/gacha/all.5.json"
 
 # Asset URLs
-ASSET_JP_EVENT = "https://bestdori.com/assets/jp/event/{}/images_rip/banner.png"
+ASSET_EVENT = "https://bestdori.com/assets/{}/event/{}/images_rip/banner.png"
+ASSET_GACHA_BANNER = "https://bestdori.com/assets/{}/homebanner_rip/{}.png"
 ASSET_JP_CARD = "https://bestdori.com/assets/jp/characters/resourceset/{}_rip/card_after_training.png"
 ASSET_JP_CARD_NORMAL = "https://bestdori.com/assets/jp/characters/resourceset/{}_rip/card_normal.png"
 
-def get_jp_event():
+# Server index → asset region code
+SERVER_CODES = ["jp", "en", "tw", "cn", "kr"]
+
+# Dataset name → endpoint
+DATASETS = {
+    "events": API_EVENTS,
+    "cards": API_CARDS,
+    "gacha": API_GACHA,
+}
+
+# How long (seconds) a dataset is considered fresh before it is revalidated
+DATASET_TTL = {
+    "events": 10 * 60,
+    "cards": 30 * 60,
+    "gacha": 30 * 60,
+}
+
+# (id, raw record) → projected record. Projected datasets are streamed
+# record by record from the response and snapshotted to disk.
+PROJECTORS = {
+    "cards": project_card,
+    "events": project_event,
+    "gacha": project_gacha,
+}
+
+# Indexes rebuilt whenever a dataset changes
+INDEX_BUILDERS = {
+    "cards": CardIndex,
+    "events": EventTimeline,
+    "gacha": GachaIndex,
+}
+
+# Response body read size for streaming projection
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Diffs up to this many records are patched into the current index in place
+INCREMENTAL_UPDATE_LIMIT = 200
+
+# Seconds between background refreshes (see BestdoriClient.start_refresher)
+REFRESH_INTERVAL = 5 * 60
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10)
+
+
+class CachedDataset:
+    """A dataset held in memory together with its HTTP validators and index."""
+
+    def __init__(self, data, etag=None, last_modified=None, index=None):
+        self.data = data
+        self.index = index
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+
+class DatasetDiff:
+    """IDs added, changed and removed between two versions of a projected dataset."""
+
+    def __init__(self, added=(), changed=(), removed=()):
+        self.added = list(added)
+        self.changed = list(changed)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    @classmethod
+    def between(cls, old, new):
+        diff = cls()
+        for record_id, record in new.items():
+            previous = old.get(record_id)
+            if previous is None:
+                diff.added.append(record_id)
+            elif previous != record:
+                diff.changed.append(record_id)
+        diff.removed = [record_id for record_id in old if record_id not in new]
+        return diff
+
+
+class BestdoriClient:
     """
-    Fetches the currently active or next event for JP Server (Server 0).
+    Async Bestdori client with an in-memory TTL cache.
+
+    - Fresh datasets are served straight from memory.
+    - Expired datasets are served stale while a single background task
+      revalidates them with If-None-Match / If-Modified-Since.
+    - Projected datasets are snapshotted to disk, so a restart serves the
+      last snapshot immediately and keeps serving it if Bestdori is down.
+    - Only a cold start without any snapshot waits on the network.
+    - start_refresher() keeps every dataset fresh in the background, applies
+      small changes to the indexes in place and publishes them to subscribers.
+      It also HEAD-checks new card art so embeds only use images that exist.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = dict(DATASET_TTL, **(ttl or {}))
+        self._session = None
+        self._cache = {}       # {name: CachedDataset}
+        self._inflight = SingleFlight()  # Fetches and snapshot loads, keyed by (kind, name)
+        self._subscribers = []
+        self._refresher = None
+        self._asset_check = None
+        self.assets = CardAssetCache({
+            VARIANT_TRAINED: ASSET_JP_CARD,
+            VARIANT_NORMAL: ASSET_JP_CARD_NORMAL,
+        })
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=REQUEST_TIMEOUT)
+        return self._session
+
+    async def close(self):
+        """Stop the refresher, cancel pending refreshes and close the HTTP session."""
+        for task in (self._refresher, self._asset_check):
+            if task:
+                task.cancel()
+        self._refresher = self._asset_check = None
+        self._inflight.cancel_all()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def get(self, name):
+        """
+        Get a dataset ("events", "cards" or "gacha").
+        Returns the projected {id: record} dict, or None if it has never been fetched successfully.
+        """
+        cached = self._cache.get(name)
+        if cached is None:
+            cached = await self._load_snapshot(name)
+        if cached is None:
+            # First use: every concurrent caller waits on the same download
+            return await self.refresh(name)
+
+        if cached.age() > self.ttl[name]:
+            # Stale-while-revalidate: answer now, refresh in the background
+            self._schedule_refresh(name)
+        return cached.data
+
+    async def _load_snapshot(self, name):
+        """Warm the memory cache from the on-disk snapshot, if there is one (shared by concurrent callers)."""
+        if name not in PROJECTORS:
+            return None
+        return await self._inflight.do(("snapshot", name), lambda: self._read_snapshot(name))
+
+    async def _read_snapshot(self, name):
+        snapshot = await asyncio.to_thread(load_snapshot, name)
+        if snapshot is None or name in self._cache:
+            return self._cache.get(name)
+
+        records = snapshot["records"]
+        index = await asyncio.to_thread(self._build_index, name, records)
+        cached = CachedDataset(records, snapshot["etag"], snapshot["last_modified"], index)
+        # Age the entry by how old the snapshot is so the TTL logic revalidates it
+        cached.fetched_at -= max(0, time.time() - snapshot["saved_at"])
+        self._cache[name] = cached
+        return cached
+
+    def _schedule_refresh(self, name):
+        return self._inflight.start(("fetch", name), lambda: self._fetch(name))
+
+    async def get_index(self, name):
+        """
+        Get the precomputed index for a dataset (see INDEX_BUILDERS).
+        Returns None if the dataset is unavailable.
+        """
+        if await self.get(name) is None:
+            return None
+        return self._cache[name].index
+
+    async def refresh(self, name):
+        """
+        Revalidate a dataset against Bestdori now, sharing any refresh already in flight.
+        Returns the current data (possibly the previous copy if the fetch failed).
+        """
+        return await self._inflight.do(("fetch", name), lambda: self._fetch(name))
+
+    async def _fetch(self, name):
+        cached = self._cache.get(name)
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            session = await self._get_session()
+            async with session.get(DATASETS[name], headers=headers) as resp:
+                if resp.status == 304 and cached:
+                    cached.fetched_at = time.monotonic()
+                    return cached.data
+                if resp.status != 200:
+                    print(f"[Bestdori Error] {name}: HTTP {resp.status}")
+                    return cached.data if cached else None
+
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+
+                # Project each record while the body streams in; the
+                # full document tree is never materialized
+                parser = StreamingProjector(PROJECTORS[name])
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    parser.feed(chunk)
+                data = parser.close()
+
+            # Diff and snapshot off the event loop
+            previous = cached.data if cached else None
+            diff = await asyncio.to_thread(self._ingest, name, data, previous, etag, last_modified)
+            index = await self._update_index(name, cached, data, diff)
+            self._cache[name] = CachedDataset(data, etag, last_modified, index)
+
+            if diff:
+                await self._publish(name, "added", [data[i] for i in diff.added])
+                await self._publish(name, "changed", [data[i] for i in diff.changed])
+                await self._publish(name, "removed", [previous[i] for i in diff.removed])
+            return data
+
+        except Exception as e:
+            print(f"[Bestdori Error] refresh {name}: {e}")
+            return cached.data if cached else None
+
+    @staticmethod
+    def _build_index(name, records):
+        builder = INDEX_BUILDERS.get(name)
+        return builder(records) if builder else None
+
+    @staticmethod
+    def _ingest(name, data, previous, etag, last_modified):
+        """Snapshot the new data and diff it against the previous copy (None on first load)."""
+        if name in PROJECTORS:
+            save_snapshot(name, data, etag, last_modified)
+        if previous is None or name not in PROJECTORS:
+            return None
+        return DatasetDiff.between(previous, data)
+
+    async def _update_index(self, name, cached, data, diff):
+        """Patch the current index in place for small diffs, rebuild it otherwise."""
+        index = cached.index if cached else None
+        if index is not None and diff is not None:
+            if not diff:
+                return index
+            if hasattr(index, "update") and len(diff) <= INCREMENTAL_UPDATE_LIMIT:
+                # Runs on the event loop so readers never see a half-applied update
+                index.update(data, diff)
+                return index
+        return await asyncio.to_thread(self._build_index, name, data)
+
+    # ------------------------------------------------------------------
+    # Change feed
+    # ------------------------------------------------------------------
+    def subscribe(self, callback):
+        """
+        Register an async callback(dataset, kind, records) for dataset changes.
+        kind is "added", "changed" or "removed" for refresh diffs (e.g. new cards),
+        or "started" for events/gachas whose JP start time has just passed.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    async def _publish(self, name, kind, records):
+        if not records:
+            return
+        for callback in list(self._subscribers):
+            try:
+                await callback(name, kind, records)
+            except Exception as e:
+                print(f"[Bestdori Error] subscriber {getattr(callback, '__name__', callback)}: {e}")
+
+    # ------------------------------------------------------------------
+    # Background refresher
+    # ------------------------------------------------------------------
+    def start_refresher(self, interval=REFRESH_INTERVAL):
+        """Start refreshing every dataset every `interval` seconds (idempotent)."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop(interval))
+
+    async def _refresh_loop(self, interval):
+        last_tick = int(time.time() * 1000)
+        await asyncio.to_thread(self.assets.load)
+        while True:
+            for name in DATASETS:
+                if name not in self._cache:
+                    await self._load_snapshot(name)
+                await self.refresh(name)
+            self._schedule_asset_check()
+
+            now = int(time.time() * 1000)
+            for name in ("events", "gacha"):
+                cached = self._cache.get(name)
+                if cached and cached.index:
+                    await self._publish(name, "started", cached.index.starting_between(last_tick, now))
+            last_tick = now
+
+            await asyncio.sleep(interval)
+
+    def _schedule_asset_check(self):
+        """Verify art for cards not checked yet; runs beside the refresher, never in a user request."""
+        cached = self._cache.get("cards")
+        if cached is None or (self._asset_check and not self._asset_check.done()):
+            return
+
+        async def check():
+            try:
+                session = await self._get_session()
+                checked = await self.assets.verify(session, cached.data)
+                if checked:
+                    print(f"[Bestdori] Verified card art for {checked} resource sets")
+            except Exception as e:
+                print(f"[Bestdori Error] asset check: {e}")
+
+        self._asset_check = asyncio.create_task(check())
+
+
+# Shared client used by the module-level helpers below
+client = BestdoriClient()
+
+
+async def get_server_event(server=SERVER_JP):
+    """
+    Fetches the currently active or next event for a server (0 = JP, 1 = EN, ...).
     Returns a dict with event info and image URL, or None if error.
     """
     try:
-        response = requests.get(API_EVENTS)
-        if response.status_code != 200:
+        timeline = await client.get_index("events")
+        if not timeline:
             return None
-        
-        events = response.json()
+
         current_time = int(time.time() * 1000)
-        
-        # Iterate to find current event
-        for event_id, event_data in events.items():
-            # Server 0 is JP. startAt and endAt are lists indexed by server ID.
-            if not event_data.get("startAt") or len(event_data["startAt"]) < 1:
-                continue
-                
-            start = int(event_data["startAt"][0]) if event_data["startAt"][0] else 0
-            end = int(event_data["endAt"][0]) if event_data["endAt"][0] else 0
-            
-            if start <= current_time <= end:
-                # Found active event
-                event_name = event_data["eventName"][0] if event_data.get("eventName") else "Unknown Event"
-                asset_bundle = event_data.get("assetBundleName")
-                banner_url = ASSET_JP_EVENT.format(asset_bundle) if asset_bundle else None
-                
-                return {
-                    "name": event_name,
-                    "end_time": end,
-                    "image": banner_url,
-                    "status": "Active"
-                }
-        
-        # If no active event, look for next upcoming
-        upcoming_events = []
-        for event_id, event_data in events.items():
-             if not event_data.get("startAt") or len(event_data["startAt"]) < 1:
-                continue
-             start = int(event_data["startAt"][0]) if event_data["startAt"][0] else 0
-             if start > current_time:
-                 upcoming_events.append((start, event_data))
-        
-        if upcoming_events:
-            # Sort by start time
-            upcoming_events.sort(key=lambda x: x[0])
-            next_event = upcoming_events[0][1]
-            event_name = next_event["eventName"][0] if next_event.get("eventName") else "Unknown Event"
-            asset_bundle = next_event.get("assetBundleName")
-            banner_url = ASSET_JP_EVENT.format(asset_bundle) if asset_bundle else None
-            
-            return {
-                "name": event_name,
-                "start_time": upcoming_events[0][0],
-                "image": banner_url,
-                "status": "Upcoming"
-            }
 
-        return None
+        active = timeline.active_at(current_time, server)
+        if active:
+            event, status = active[0], "Active"
+        else:
+            event, status = timeline.next_after(current_time, server), "Upcoming"
+        if not event:
+            return None
+
+        asset_bundle = event["asset_bundle"]
+        banner_url = ASSET_EVENT.format(SERVER_CODES[server], asset_bundle) if asset_bundle else None
+
+        return {
+            "name": event["name"],
+            "start_time": event["start"],
+            "end_time": event["end"],
+            "image": banner_url,
+            "status": status
+        }
 
     except Exception as e:
-        print(f"[Bestdori Error] get_jp_event: {e}")
+        print(f"[Bestdori Error] get_server_event: {e}")
         return None
 
+
+async def get_jp_event():
+    """
+    Fetches the currently active or next event for JP Server (Server 0).
+    Returns a dict with event info and image URL, or None if error.
+    """
+    return await get_server_event(SERVER_JP)
+
+def _gacha_result(gacha, server, cards_index=None):
+    """Public gacha dict (with banner URL and rate-up cards) from a flattened timeline entry."""
+    asset_bundle = gacha["asset_bundle"]
+    banner_url = ASSET_GACHA_BANNER.format(SERVER_CODES[server], asset_bundle) if asset_bundle else None
+
+    rate_up = []
+    if cards_index:
+        rate_up = [_card_result(cards_index.by_id[c]) for c in gacha["new_cards"] if c in cards_index.by_id]
+
+    return {
+        "id": gacha["id"],
+        "name": gacha["name"],
+        "type": gacha["type"],
+        "start_time": gacha["start"],
+        "end_time": gacha["end"],
+        "image": banner_url,
+        "rate_up": rate_up
+    }
+
+
+async def get_current_gacha(server=SERVER_JP, limit=3):
+    """
+    Fetches the gachas currently running on a server (0 = JP), newest first.
+    Returns a list of dicts with gacha info, banner URL and rate-up cards.
+    """
+    try:
+        gacha_index = await client.get_index("gacha")
+        if not gacha_index:
+            return []
+        cards_index = await client.get_index("cards")
+
+        current_time = int(time.time() * 1000)
+        running = gacha_index.active_at(current_time, server)
+        # Prefer gachas with rate-up cards over permanent pools
+        running.sort(key=lambda g: (bool(g["new_cards"]), g["start"]), reverse=True)
+        return [_gacha_result(g, server, cards_index) for g in running[:limit]]
+
+    except Exception as e:
+        print(f"[Bestdori Error] get_current_gacha: {e}")
+        return []
+
+
+async def get_card_gachas(card_id):
+    """
+    Which gachas featured a card on rate-up (JP names and times).
+    Returns a list of dicts, earliest first.
+    """
+    try:
+        gacha_index = await client.get_index("gacha")
+        if not gacha_index:
+            return []
+
+        results = []
+        for gacha in gacha_index.featuring(card_id):
+            entry = gacha_index.servers[SERVER_JP].by_id.get(gacha["id"])
+            if entry:
+                results.append(_gacha_result(entry, SERVER_JP))
+        return results
+
+    except Exception as e:
+        print(f"[Bestdori Error] get_card_gachas: {e}")
+        return []
+
+
+async def get_gacha_rate_up(gacha_id):
+    """Rate-up cards of a gacha as card dicts (with images)."""
+    try:
+        gacha_index = await client.get_index("gacha")
+        cards_index = await client.get_index("cards")
+        if not gacha_index or not cards_index:
+            return []
+        return [_card_result(cards_index.by_id[c]) for c in gacha_index.rate_up(gacha_id) if c in cards_index.by_id]
+
+    except Exception as e:
+        print(f"[Bestdori Error] get_gacha_rate_up: {e}")
+        return []
+
 # Character ID Mapping
 CHARACTER_MAP = {
     "kasumi": 1, "tae": 2, "rimi": 3, "saaya": 4, "arisa": 5, # Poppin'Party
@@ -86,7 +481,8 @@ CHARACTER_MAP = {
     "yukina": 21, "sayo": 22, "lisa": 23, "ako": 24, "rinko": 25, # Roselia
     "mashiro": 26, "touko": 27, "nanami": 28, "tsukushi": 29, "rui": 30, # Morfonica
     "layer": 31, "lock": 32, "masking": 33, "pareo": 34, "chu2": 35, # RAS
-    "rei": 31, "roku": 32, "masuki": 33, "chiyuri": 35 # RAS Alternate names
+    "rei": 31, "roku": 32, "masuki": 33, "chiyuri": 35, # RAS Alternate names
+    "tomori": 36, "anon": 37, "raana": 38, "soyo": 39, "taki": 40, # MyGO!!!!!
 }
 
 # Band → Member Mapping
@@ -112,7 +508,34 @@ BAND_MAP = {
     "ave mujica": ["mortis", "oblivionis", "timoris", "doloris", "pectus"],
 }
 
-def get_character_cards(character_name, limit=1, card_type_filter=None, rarity_filter=None):
+# Fuzzy lookup over every character/band name and alias
+name_index = NameIndex(CHARACTER_MAP, BAND_MAP)
+
+
+def resolve_name(text):
+    """
+    Best character or band mentioned in free text, tolerant of typos
+    ("yukinaa", "rosellia") and alternate spellings ("moka", "minato yukina").
+    Returns a NameMatch (kind, name, character_id, confidence) or None.
+    """
+    return name_index.resolve(text)
+
+def _card_result(card):
+    """Public card dict (with image URL) from a projected index entry."""
+    # Verified art variant, or the rarity-based guess if not checked yet
+    image_url = client.assets.image_url(card)
+
+    return {
+        "id": card["id"],
+        "title": card["title"],
+        "rarity": card["rarity"],
+        "type": card["type"],
+        "image": image_url,
+        "release_date": card["release_date"]
+    }
+
+
+async def get_character_cards(character_name, limit=1, card_type_filter=None, rarity_filter=None):
     """
     Fetches cards for a specific character with optional type and rarity filtering.
     Args:
@@ -120,85 +543,26 @@ def get_character_cards(character_name, limit=1, card_type_filter=None, rarity_f
         limit (int): Number of cards to return.
         card_type_filter (str): Specific card type to filter (e.g., "dream_fes", "kirafes", "limited").
         rarity_filter (int): Minimum rarity to filter (e.g., 4 for 4-star, 5 for 5-star).
-    Returns list of dicts with card info and image.
+    Returns list of dicts with card info and image, newest first.
     """
     char_id = CHARACTER_MAP.get(character_name.lower())
     if not char_id:
         return []
 
     try:
-        response = requests.get(API_CARDS)
-        if response.status_code != 200:
+        index = await client.get_index("cards")
+        if not index:
             return []
-            
-        all_cards = response.json()
-        found_cards = []
-        
-        for card_id, card_data in all_cards.items():
-            if card_data.get("characterId") == char_id:
-                # Check for limited/specific type if requested
-                card_type = card_data.get("type", "permanent")
-                rarity = card_data.get("rarity", 3)
-
-                # Rarity filter
-                if rarity_filter is not None and rarity < rarity_filter:
-                    continue
-
-                # Filter Logic
-                if card_type_filter:
-                    filter_lower = card_type_filter.lower()
-                    
-                    # Direct Match
-                    if filter_lower in card_type.lower():
-                        pass 
-                    # Special Handling for "limited" general request vs specific "limited" type
-                    elif filter_lower == "limited":
-                        if card_type not in ["limited", "dream_fes", "birthday", "kirafes"]:
-                            continue
-                    # Handle DreamFes / KiraFes aliases
-                    elif "dream" in filter_lower or "fes" in filter_lower:
-                        if "dream_fes" not in card_type and "kirafes" not in card_type:
-                            continue
-                    else:
-                        continue
-                
-                # Construct data
-                prefix = card_data.get("prefix", ["Unknown"])[1] # English if available
-                if not prefix:
-                     prefix = card_data.get("prefix", ["?"])[0] # Fallback to JP
-
-                resource_set = card_data.get("resourceSetName")
-                
-                # Image URL selection
-                if rarity >= 3:
-                     image_url = ASSET_JP_CARD.format(resource_set)
-                else:
-                     image_url = ASSET_JP_CARD_NORMAL.format(resource_set)
-                
-                # Handle release date
-                released_at = card_data.get("releasedAt", [0])
-                release_date = released_at[0] if released_at else 0
-
-                found_cards.append({
-                    "id": card_id,
-                    "title": prefix,
-                    "rarity": rarity,
-                    "type": card_type,
-                    "image": image_url,
-                    "release_date": release_date
-                })
-        
-        # Sort by release date (newest first)
-        found_cards.sort(key=lambda x: int(x["release_date"] or 0), reverse=True)
-        
-        return found_cards[:limit]
+
+        cards = index.newest([char_id], card_type_filter, rarity_filter, limit)
+        return [_card_result(card) for card in cards]
 
     except Exception as e:
         print(f"[Bestdori Error] get_character_cards: {e}")
         return []
 
 
-def get_band_cards(band_name, limit=1, card_type_filter=None, rarity_filter=None):
+async def get_band_cards(band_name, limit=1, card_type_filter=None, rarity_filter=None):
     """
     Fetches cards across all members of a band.
     Returns the best matching card(s) sorted by release date.
@@ -207,18 +571,77 @@ def get_band_cards(band_name, limit=1, card_type_filter=None, rarity_filter=None
     if not members:
         return []
 
-    all_cards = []
+    # Tag each card with the member name used in BAND_MAP
+    member_by_id = {}
     for member in members:
-        cards = get_character_cards(
-            member,
-            limit=5,  # Get more per member so we can cross-compare
-            card_type_filter=card_type_filter,
-            rarity_filter=rarity_filter
-        )
+        char_id = CHARACTER_MAP.get(member)
+        if char_id:
+            member_by_id.setdefault(char_id, member)
+    if not member_by_id:
+        return []
+
+    try:
+        index = await client.get_index("cards")
+        if not index:
+            return []
+
+        cards = index.newest(list(member_by_id), card_type_filter, rarity_filter, limit)
+        results = []
         for card in cards:
-            card["character"] = member  # Tag which member it belongs to
-        all_cards.extend(cards)
+            result = _card_result(card)
+            result["character"] = member_by_id[card["character_id"]]
+            results.append(result)
+        return results
 
-    # Sort all collected cards by release date (newest first)
-    all_cards.sort(key=lambda x: int(x["release_date"] or 0), reverse=True)
-    return all_cards[:limit]
+    except Exception as e:
+        print(f"[Bestdori Error] get_band_cards: {e}")
+        return []
+
+
+async def search_cards(band_name=None, character_name=None, card_type_filter=None, rarity_filter=None,
+                       attributes=None, released_after=None, limit=3):
+    """
+    Multi-criteria card search over the columnar card store.
+    Args:
+        band_name (str): Restrict to a band from BAND_MAP (e.g., "roselia").
+        character_name (str): Restrict to one character from CHARACTER_MAP.
+        card_type_filter (str): Card type filter, same rules as get_character_cards.
+        rarity_filter (int): Minimum rarity.
+        attributes (set): Card attributes (e.g., {"cool", "pure"}).
+        released_after (int): Only cards released after this JP timestamp (ms).
+        limit (int): Number of cards to return.
+    Returns list of dicts with card info and image, newest first.
+    """
+    band_ids = None
+    character_ids = None
+    if band_name:
+        members = BAND_MAP.get(band_name.lower(), [])
+        # Filter on the band_id column; bands without known members have no cards to find
+        band_ids = {band_for_character(CHARACTER_MAP[m]) for m in members if m in CHARACTER_MAP}
+        if not band_ids:
+            return []
+    if character_name:
+        char_id = CHARACTER_MAP.get(character_name.lower())
+        if char_id is None:
+            return []
+        character_ids = {char_id}
+
+    try:
+        index = await client.get_index("cards")
+        if not index:
+            return []
+
+        cards = index.search(
+            card_type_filter,
+            limit,
+            character_ids=character_ids,
+            band_ids=band_ids,
+            min_rarity=rarity_filter,
+            attributes=attributes,
+            released_after=released_after
+        )
+        return [_card_result(card) for card in cards]
+
+    except Exception as e:
+        print(f"[Bestdori Error] search_cards: {e}")
+        return []
@@ -0,0 +1,103 @@
+"""
+Bestdori Card Asset Cache
+Remembers which card art variant actually exists per resourceSetName, so
+embeds never point at a missing image. Checks run in the background.
+"""
+
+import asyncio
+
+from utils.bestdori_snapshot import load_snapshot, save_snapshot
+
+# Card art variants, in order of preference for 3★+ cards
+VARIANT_TRAINED = "after_training"
+VARIANT_NORMAL = "normal"
+
+# Parallel HEAD requests per verification run, and cards per batch
+ASSET_CHECK_CONCURRENCY = 8
+ASSET_CHECK_BATCH = 200
+
+# Sentinel for "checked, neither variant exists"
+MISSING = ""
+
+
+class CardAssetCache:
+    """
+    {resource_set: variant} for every verified card.
+    Lookups are pure dict reads; verification happens during dataset refresh.
+    """
+
+    def __init__(self, url_templates):
+        self.url_templates = url_templates  # {variant: url template with one {}}
+        self.variants = {}
+        self.loaded = False
+
+    def load(self):
+        snapshot = load_snapshot("assets")
+        if snapshot:
+            self.variants.update(snapshot["records"])
+        self.loaded = True
+
+    def save(self):
+        save_snapshot("assets", dict(self.variants))
+
+    @staticmethod
+    def candidates(card):
+        """Variants worth trying for a card, best first."""
+        if card["rarity"] >= 3:
+            return [VARIANT_TRAINED, VARIANT_NORMAL]
+        return [VARIANT_NORMAL]
+
+    def image_url(self, card):
+        """
+        Image URL for a projected card.
+        Unverified cards fall back to the rarity-based guess; verified cards with no art return None.
+        """
+        resource_set = card["resource_set"]
+        if not resource_set:
+            return None
+        variant = self.variants.get(resource_set)
+        if variant is None:
+            variant = self.candidates(card)[0]
+        elif variant == MISSING:
+            return None
+        return self.url_templates[variant].format(resource_set)
+
+    async def _check(self, session, semaphore, card):
+        """HEAD each candidate until one exists. Returns the variant, MISSING, or None on transient errors."""
+        for variant in self.candidates(card):
+            url = self.url_templates[variant].format(card["resource_set"])
+            async with semaphore:
+                try:
+                    async with session.head(url, allow_redirects=True) as resp:
+                        if resp.status == 200:
+                            return variant
+                        if resp.status != 404:
+                            return None  # Try again next refresh
+                except Exception:
+                    return None
+        return MISSING
+
+    async def verify(self, session, cards, concurrency=ASSET_CHECK_CONCURRENCY):
+        """
+        HEAD-check every card whose resource set has not been verified yet.
+        Runs in batches so results are saved as they come in. Returns the number of sets checked.
+        """
+        if not self.loaded:
+            await asyncio.to_thread(self.load)
+
+        pending = {}
+        for card in cards.values():
+            resource_set = card["resource_set"]
+            if resource_set and resource_set not in self.variants:
+                pending.setdefault(resource_set, card)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        todo = list(pending.values())
+        for start in range(0, len(todo), ASSET_CHECK_BATCH):
+            batch = todo[start:start + ASSET_CHECK_BATCH]
+            results = await asyncio.gather(*(self._check(session, semaphore, card) for card in batch))
+            for card, variant in zip(batch, results):
+                if variant is not None:
+                    self.variants[card["resource_set"]] = variant
+            await asyncio.to_thread(self.save)
+        return len(todo)
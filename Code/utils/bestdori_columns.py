@@ -0,0 +1,163 @@
+"""
+Bestdori Columnar Card Store
+Cards held as NumPy columns so multi-criteria searches are boolean masks
+instead of per-card Python loops.
+"""
+
+import numpy as np
+
+# Bestdori band IDs, keyed by the character ID range of their members
+BAND_IDS = {
+    range(1, 6): 1,     # Poppin'Party
+    range(6, 11): 2,    # Afterglow
+    range(11, 16): 3,   # Hello, Happy World!
+    range(16, 21): 4,   # Pastel*Palettes
+    range(21, 26): 5,   # Roselia
+    range(26, 31): 21,  # Morfonica
+    range(31, 36): 18,  # RAISE A SUILEN
+    range(36, 41): 45,  # MyGO!!!!!
+}
+
+
+def band_for_character(character_id):
+    """Bestdori band ID of a character, or 0 if unknown."""
+    for members, band_id in BAND_IDS.items():
+        if character_id in members:
+            return band_id
+    return 0
+
+
+class Vocabulary:
+    """Interns a string column into small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+    def codes_for(self, values):
+        """Codes of the given values that exist in this column."""
+        return [self.codes[v] for v in values if v in self.codes]
+
+
+class CardColumns:
+    """
+    Column-oriented view of the projected cards dataset.
+
+    Numeric columns: character_id, band_id, rarity, released (ms).
+    Interned columns: bucket (type), attribute.
+    Row order matches self.ids (self.rows maps id → row). Only the ids are kept per row: the projected
+    card dicts live in the owning CardIndex, which maps query results back.
+    """
+
+    COLUMNS = ("character_id", "band_id", "rarity", "bucket", "attribute", "released")
+
+    def __init__(self, cards):
+        self.buckets = Vocabulary()
+        self.attributes = Vocabulary()
+        records = list(cards.values())
+
+        self.ids = [card["id"] for card in records]
+        self.rows = {card_id: row for row, card_id in enumerate(self.ids)}
+        self.character_id = np.array([card["character_id"] or 0 for card in records], dtype=np.int16)
+        self.band_id = np.array([band_for_character(c) for c in self.character_id.tolist()], dtype=np.int16)
+        self.rarity = np.array([card["rarity"] or 0 for card in records], dtype=np.int8)
+        self.bucket = np.array([self.buckets.code(card["bucket"]) for card in records], dtype=np.int8)
+        self.attribute = np.array([self.attributes.code(card.get("attribute")) for card in records], dtype=np.int8)
+        self.released = np.array([card["released"] for card in records], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _values(self, card):
+        character_id = card["character_id"] or 0
+        return (
+            character_id,
+            band_for_character(character_id),
+            card["rarity"] or 0,
+            self.buckets.code(card["bucket"]),
+            self.attributes.code(card.get("attribute")),
+            card["released"],
+        )
+
+    def update(self, cards, diff):
+        """
+        Apply a refresh diff (see bestdori.DatasetDiff) in place.
+        Changed rows are overwritten, removed rows are filled by the last row,
+        and added rows are appended with one concatenate per column.
+        """
+        for card_id in diff.changed:
+            row = self.rows.get(card_id)
+            if row is None:
+                continue
+            for column, value in zip(self.COLUMNS, self._values(cards[card_id])):
+                getattr(self, column)[row] = value
+
+        for card_id in diff.removed:
+            row = self.rows.pop(card_id, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+                for column in self.COLUMNS:
+                    values = getattr(self, column)
+                    values[row] = values[last]
+            self.ids.pop()
+        if diff.removed:
+            for column in self.COLUMNS:
+                setattr(self, column, getattr(self, column)[:len(self.ids)])
+
+        added = [card_id for card_id in diff.added if card_id not in self.rows]
+        if added:
+            new_rows = list(zip(*(self._values(cards[card_id]) for card_id in added)))
+            for column, values in zip(self.COLUMNS, new_rows):
+                current = getattr(self, column)
+                setattr(self, column, np.concatenate([current, np.array(values, dtype=current.dtype)]))
+            for card_id in added:
+                self.rows[card_id] = len(self.ids)
+                self.ids.append(card_id)
+
+    def mask(self, character_ids=None, band_ids=None, buckets=None, min_rarity=None,
+             attributes=None, released_after=None, released_before=None):
+        """
+        Boolean row mask for the given criteria (None means "any").
+        buckets are normalized type buckets, e.g. {"dream_fes", "kirafes"}.
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+
+        if character_ids is not None:
+            mask &= np.isin(self.character_id, list(character_ids))
+        if band_ids is not None:
+            mask &= np.isin(self.band_id, list(band_ids))
+        if min_rarity is not None:
+            mask &= self.rarity >= min_rarity
+        if buckets is not None:
+            mask &= np.isin(self.bucket, self.buckets.codes_for(buckets))
+        if attributes is not None:
+            mask &= np.isin(self.attribute, self.attributes.codes_for(attributes))
+        if released_after is not None:
+            mask &= self.released > released_after
+        if released_before is not None:
+            mask &= self.released < released_before
+        return mask
+
+    def query(self, limit=None, **criteria):
+        """
+        Cards matching every criterion (see mask()), newest first.
+        Returns a list of card ids.
+        """
+        rows = np.flatnonzero(self.mask(**criteria))
+        if limit is not None and limit < len(rows):
+            # Only fully sort the top `limit` rows
+            top = np.argpartition(-self.released[rows], limit - 1)[:limit]
+            rows = rows[top]
+        rows = rows[np.argsort(-self.released[rows], kind="stable")]
+        return [self.ids[i] for i in rows.tolist()]
@@ -0,0 +1,431 @@
+"""
+Bestdori Dataset Indexes
+Precomputed lookup structures built once per dataset refresh.
+"""
+
+import bisect
+import heapq
+from itertools import islice
+
+from utils.bestdori_columns import CardColumns
+
+# Normalized card type buckets
+TYPE_LIMITED = "limited"
+TYPE_DREAM_FES = "dream_fes"
+TYPE_KIRAFES = "kirafes"
+TYPE_BIRTHDAY = "birthday"
+TYPE_PERMANENT = "permanent"
+
+# Raw Bestdori type spellings → bucket
+TYPE_ALIASES = {
+    "dreamfes": TYPE_DREAM_FES,
+    "dream_fes": TYPE_DREAM_FES,
+    "kirafes": TYPE_KIRAFES,
+    "kira_fes": TYPE_KIRAFES,
+    "limited": TYPE_LIMITED,
+    "birthday": TYPE_BIRTHDAY,
+    "permanent": TYPE_PERMANENT,
+}
+
+# A plain "limited" request covers every gacha-limited bucket
+LIMITED_BUCKETS = {TYPE_LIMITED, TYPE_DREAM_FES, TYPE_BIRTHDAY, TYPE_KIRAFES}
+FES_BUCKETS = {TYPE_DREAM_FES, TYPE_KIRAFES}
+
+
+def normalize_card_type(card_type):
+    """Map a raw Bestdori card type to its bucket (unknown types keep their own name)."""
+    key = (card_type or TYPE_PERMANENT).strip().lower()
+    return TYPE_ALIASES.get(key, key)
+
+
+def resolve_type_filter(card_type_filter, buckets):
+    """
+    Turn a free-form type filter into the set of matching buckets.
+    Returns None when no filtering is requested.
+    """
+    if not card_type_filter:
+        return None
+
+    filter_lower = card_type_filter.lower()
+    normalized = normalize_card_type(filter_lower)
+
+    # Direct match on the bucket name
+    matched = {b for b in buckets if filter_lower in b or normalized == b}
+    # General "limited" request vs the specific "limited" type
+    if filter_lower == TYPE_LIMITED:
+        matched |= LIMITED_BUCKETS
+    # DreamFes / KiraFes aliases
+    elif "dream" in filter_lower or "fes" in filter_lower:
+        matched |= FES_BUCKETS
+    return matched
+
+
+def _release_time(value):
+    """Bestdori timestamps are millisecond strings; missing ones sort as 0."""
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def project_card(card_id, card_data):
+    """Keep only the card fields the bot uses."""
+    prefix_list = card_data.get("prefix") or []
+    # English if available, fall back to JP
+    prefix = prefix_list[1] if len(prefix_list) > 1 and prefix_list[1] else None
+    if not prefix:
+        prefix = prefix_list[0] if prefix_list and prefix_list[0] else "?"
+
+    released_at = card_data.get("releasedAt") or [0]
+    card_type = card_data.get("type", TYPE_PERMANENT)
+
+    return {
+        "id": str(card_id),
+        "character_id": card_data.get("characterId"),
+        "title": prefix,
+        "rarity": card_data.get("rarity", 3),
+        "type": card_type,
+        "bucket": normalize_card_type(card_type),
+        "attribute": card_data.get("attribute"),
+        "resource_set": card_data.get("resourceSetName"),
+        "release_date": released_at[0],
+        "released": _release_time(released_at[0]),
+    }
+
+
+def project_cards(all_cards):
+    """Project a raw cards payload to {card_id: card}."""
+    return {str(card_id): project_card(card_id, card_data) for card_id, card_data in all_cards.items()}
+
+
+class CardIndex:
+    """
+    Cards grouped by character → type bucket → rarity.
+    Every leaf list is sorted newest first, so "newest N matching" is a
+    k-way merge of a few short lists instead of a scan over every card.
+    Arbitrary multi-criteria searches go through the columnar store.
+    """
+
+    def __init__(self, cards):
+        self.by_character = {}  # {character_id: {bucket: {rarity: [card, ...]}}}
+        self.by_id = {}
+        self.buckets = set()
+
+        for card in cards.values():
+            self.add(card)
+        self._sort()
+        self.columns = CardColumns(cards)
+
+    def add(self, card):
+        self.by_id[card["id"]] = card
+        self.buckets.add(card["bucket"])
+        self._leaf(card).append(card)
+
+    def update(self, cards, diff):
+        """
+        Apply a refresh diff (see bestdori.DatasetDiff) in place.
+        Cards are re-slotted into their sorted lists and only the diffed
+        rows of the columns are touched.
+        """
+        for card_id in diff.removed + diff.changed:
+            card = self.by_id.pop(card_id, None)
+            if card:
+                self._leaf(card).remove(card)
+        for card_id in diff.added + diff.changed:
+            card = cards[card_id]
+            self.by_id[card_id] = card
+            self.buckets.add(card["bucket"])
+            leaf = self._leaf(card)
+            # Leaves are newest first, i.e. ascending by -released
+            keys = [-c["released"] for c in leaf]
+            leaf.insert(bisect.bisect_right(keys, -card["released"]), card)
+        self.columns.update(cards, diff)
+
+    def _leaf(self, card):
+        rarities = self.by_character.setdefault(card["character_id"], {}).setdefault(card["bucket"], {})
+        return rarities.setdefault(card["rarity"], [])
+
+    def _sort(self):
+        for buckets in self.by_character.values():
+            for rarities in buckets.values():
+                for cards in rarities.values():
+                    cards.sort(key=lambda c: c["released"], reverse=True)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def resolve_type_filter(self, card_type_filter):
+        return resolve_type_filter(card_type_filter, self.buckets)
+
+    def search(self, card_type_filter=None, limit=None, **criteria):
+        """
+        Vectorized search, newest first. Criteria are those of CardColumns.mask(),
+        e.g. band_ids={5}, min_rarity=4, card_type_filter="dream_fes", released_after=ms.
+        """
+        buckets = self.resolve_type_filter(card_type_filter)
+        card_ids = self.columns.query(limit=limit, buckets=buckets, **criteria)
+        return [self.by_id[card_id] for card_id in card_ids]
+
+    def newest(self, character_ids, card_type_filter=None, rarity_filter=None, limit=1):
+        """
+        Newest cards across the given characters matching the filters.
+        Returns a list of projected card dicts, newest first.
+        """
+        buckets = self.resolve_type_filter(card_type_filter)
+
+        streams = []
+        for character_id in character_ids:
+            for bucket, rarities in self.by_character.get(character_id, {}).items():
+                if buckets is not None and bucket not in buckets:
+                    continue
+                for rarity, cards in rarities.items():
+                    if rarity_filter is not None and rarity < rarity_filter:
+                        continue
+                    streams.append(cards)
+
+        merged = heapq.merge(*streams, key=lambda c: c["released"], reverse=True)
+        return list(islice(merged, limit))
+
+
+# Server indexes used by Bestdori's per-server lists
+SERVER_JP = 0
+SERVER_EN = 1
+SERVER_TW = 2
+SERVER_CN = 3
+SERVER_KR = 4
+SERVER_COUNT = 5
+
+
+def _per_server(values, convert):
+    values = list(values or [])[:SERVER_COUNT]
+    values += [None] * (SERVER_COUNT - len(values))
+    return [convert(v) if v else None for v in values]
+
+
+def project_event(event_id, event_data):
+    """Keep only the event fields the bot uses (names and times for every server)."""
+    return {
+        "id": str(event_id),
+        "names": _per_server(event_data.get("eventName"), str),
+        "asset_bundle": event_data.get("assetBundleName"),
+        "starts": _per_server(event_data.get("startAt"), _release_time),
+        "ends": _per_server(event_data.get("endAt"), _release_time),
+    }
+
+
+def project_gacha(gacha_id, gacha_data):
+    """Keep only the gacha fields the bot uses (names, times and rate-up cards)."""
+    return {
+        "id": str(gacha_id),
+        "names": _per_server(gacha_data.get("gachaName"), str),
+        "asset_bundle": gacha_data.get("bannerAssetBundleName"),
+        "type": gacha_data.get("type"),
+        "starts": _per_server(gacha_data.get("publishedAt"), _release_time),
+        "ends": _per_server(gacha_data.get("closedAt"), _release_time),
+        "new_cards": [str(card_id) for card_id in gacha_data.get("newCards") or []],
+    }
+
+
+def _server_entry(record, server):
+    """
+    Flatten a projected event/gacha to one server's view. None if not scheduled there.
+    Per-server lists become scalar name/start/end; other fields are kept as-is.
+    """
+    start = record["starts"][server]
+    if not start:
+        return None
+
+    entry = {k: v for k, v in record.items() if k not in ("names", "starts", "ends")}
+    # Untranslated servers fall back to the JP name
+    entry["name"] = record["names"][server] or record["names"][SERVER_JP] or "Unknown"
+    entry["start"] = start
+    entry["end"] = record["ends"][server] or 0
+    return entry
+
+
+# Entries running longer than this (permanent gachas, etc.) are kept out of
+# the bisect arrays so they don't stretch max_end for everything after them
+LONG_RUNNING_MS = 60 * 24 * 60 * 60 * 1000
+
+
+class ServerTimeline:
+    """
+    Events of one server sorted by start time.
+    max_end[i] is the latest end among events[0..i], which lets interval
+    queries stop walking backwards as soon as nothing earlier can overlap.
+    The few long-running entries are checked separately.
+    """
+
+    def __init__(self, events):
+        events.sort(key=lambda e: (e["start"], e["end"]))
+        self.by_id = {e["id"]: e for e in events}
+        self.long_running = [e for e in events if e["end"] - e["start"] > LONG_RUNNING_MS]
+        self.events = [e for e in events if e["end"] - e["start"] <= LONG_RUNNING_MS]
+        self.starts = [e["start"] for e in self.events]
+        self.max_end = []
+        self._fix_max_end(0)
+
+    def _fix_max_end(self, lo):
+        """Recompute max_end from position lo onwards."""
+        del self.max_end[lo:]
+        latest = self.max_end[-1] if self.max_end else 0
+        for e in self.events[lo:]:
+            latest = max(latest, e["end"])
+            self.max_end.append(latest)
+
+    def update(self, removed_ids, added):
+        """
+        Remove events by id and insert new ones, keeping the sort order.
+        Changed events are passed as both a removal and an addition.
+        New events start near the end, so max_end is only recomputed for the tail.
+        """
+        lo = len(self.events)
+        for event_id in removed_ids:
+            e = self.by_id.pop(event_id, None)
+            if e is None:
+                continue
+            if e in self.long_running:
+                self.long_running.remove(e)
+                continue
+            i = bisect.bisect_left(self.starts, e["start"])
+            while self.events[i] is not e:
+                i += 1
+            del self.events[i]
+            del self.starts[i]
+            lo = min(lo, i)
+
+        for e in added:
+            self.by_id[e["id"]] = e
+            if e["end"] - e["start"] > LONG_RUNNING_MS:
+                self.long_running.append(e)
+                continue
+            # Same order as the initial sort: by start, then end
+            i = bisect.bisect_right(self.starts, e["start"])
+            while i > 0 and self.starts[i - 1] == e["start"] and self.events[i - 1]["end"] > e["end"]:
+                i -= 1
+            self.events.insert(i, e)
+            self.starts.insert(i, e["start"])
+            lo = min(lo, i)
+
+        self._fix_max_end(lo)
+
+    def overlapping(self, a, b):
+        """Events with start <= b and end >= a, latest start first."""
+        found = []
+        i = bisect.bisect_right(self.starts, b) - 1
+        while i >= 0 and self.max_end[i] >= a:
+            if self.events[i]["end"] >= a:
+                found.append(self.events[i])
+            i -= 1
+        long_running = [e for e in self.long_running if e["start"] <= b and e["end"] >= a]
+        if long_running:
+            found = sorted(found + long_running, key=lambda e: e["start"], reverse=True)
+        return found
+
+    def active_at(self, t):
+        """Events running at time t (ms), latest start first."""
+        return self.overlapping(t, t)
+
+    def starting_between(self, a, b):
+        """Events with a < start <= b, earliest first."""
+        lo = bisect.bisect_right(self.starts, a)
+        hi = bisect.bisect_right(self.starts, b)
+        found = self.events[lo:hi] + [e for e in self.long_running if a < e["start"] <= b]
+        return sorted(found, key=lambda e: e["start"])
+
+    def next_after(self, t):
+        """The first event starting strictly after t (ms), or None."""
+        i = bisect.bisect_right(self.starts, t)
+        found = self.events[i] if i < len(self.events) else None
+        for e in self.long_running:
+            if e["start"] > t and (found is None or e["start"] < found["start"]):
+                found = e
+        return found
+
+    def __len__(self):
+        return len(self.events) + len(self.long_running)
+
+
+class EventTimeline:
+    """Per-server interval index over the events dataset."""
+
+    def __init__(self, events):
+        self.servers = []
+        for server in range(SERVER_COUNT):
+            flattened = [_server_entry(event, server) for event in events.values()]
+            self.servers.append(ServerTimeline([e for e in flattened if e]))
+
+    def update(self, events, diff):
+        """Apply a refresh diff (see bestdori.DatasetDiff) to every server in place."""
+        removed = diff.removed + diff.changed
+        for server, timeline in enumerate(self.servers):
+            added = [_server_entry(events[event_id], server) for event_id in diff.added + diff.changed]
+            timeline.update(removed, [e for e in added if e])
+
+    def __len__(self):
+        return len(self.servers[SERVER_JP])
+
+    def active_at(self, t, server=SERVER_JP):
+        return self.servers[server].active_at(t)
+
+    def next_after(self, t, server=SERVER_JP):
+        return self.servers[server].next_after(t)
+
+    def overlapping(self, a, b, server=SERVER_JP):
+        return self.servers[server].overlapping(a, b)
+
+    def starting_between(self, a, b, server=SERVER_JP):
+        return self.servers[server].starting_between(a, b)
+
+
+def _jp_start(gacha):
+    return gacha["starts"][SERVER_JP] or 0
+
+
+class GachaIndex(EventTimeline):
+    """
+    Per-server gacha timeline plus card ↔ gacha lookups.
+    - cards_by_gacha: gacha_id → rate-up card ids
+    - gachas_by_card: card_id → gacha ids featuring it, earliest JP release first
+    """
+
+    def __init__(self, gachas):
+        super().__init__(gachas)
+        self.by_id = gachas
+        self.cards_by_gacha = {}
+        self.gachas_by_card = {}
+
+        for gacha in sorted(gachas.values(), key=_jp_start):
+            self.cards_by_gacha[gacha["id"]] = gacha["new_cards"]
+            for card_id in gacha["new_cards"]:
+                self.gachas_by_card.setdefault(card_id, []).append(gacha["id"])
+
+    def update(self, gachas, diff):
+        """Apply a refresh diff (see bestdori.DatasetDiff) in place."""
+        super().update(gachas, diff)
+
+        for gacha_id in diff.removed + diff.changed:
+            for card_id in self.cards_by_gacha.pop(gacha_id, []):
+                featured = self.gachas_by_card.get(card_id, [])
+                if gacha_id in featured:
+                    featured.remove(gacha_id)
+                if not featured:
+                    self.gachas_by_card.pop(card_id, None)
+        self.by_id = gachas
+
+        for gacha_id in diff.added + diff.changed:
+            gacha = gachas[gacha_id]
+            self.cards_by_gacha[gacha_id] = gacha["new_cards"]
+            for card_id in gacha["new_cards"]:
+                featured = self.gachas_by_card.setdefault(card_id, [])
+                # Keep earliest JP release first
+                keys = [_jp_start(gachas[g]) for g in featured]
+                featured.insert(bisect.bisect_right(keys, _jp_start(gacha)), gacha_id)
+
+    def featuring(self, card_id):
+        """Projected gachas that had this card on rate-up."""
+        return [self.by_id[g] for g in self.gachas_by_card.get(str(card_id), [])]
+
+    def rate_up(self, gacha_id):
+        """Card ids on rate-up in a gacha."""
+        return self.cards_by_gacha.get(str(gacha_id), [])
@@ -0,0 +1,242 @@
+"""
+Bestdori Name Index
+Fuzzy resolution of character and band names (typos, romanization
+variants, full names) to a single entity with a confidence score.
+"""
+
+import re
+
+# Full names and alternate spellings, keyed by the CHARACTER_MAP name
+CHARACTER_ALIASES = {
+    "kasumi": ["toyama kasumi", "kasumi toyama"],
+    "tae": ["hanazono tae", "tae hanazono", "otae"],
+    "rimi": ["ushigome rimi", "rimi ushigome"],
+    "saaya": ["yamabuki saaya", "saaya yamabuki"],
+    "arisa": ["ichigaya arisa", "arisa ichigaya"],
+    "ran": ["mitake ran", "ran mitake"],
+    "moca": ["aoba moca", "moca aoba", "moka", "aoba moka"],
+    "himari": ["uehara himari", "himari uehara"],
+    "tomoe": ["udagawa tomoe", "tomoe udagawa"],
+    "tsugumi": ["hazawa tsugumi", "tsugumi hazawa", "tsugu"],
+    "kokoro": ["tsurumaki kokoro", "kokoro tsurumaki"],
+    "kaoru": ["seta kaoru", "kaoru seta"],
+    "hagumi": ["kitazawa hagumi", "hagumi kitazawa"],
+    "kanon": ["matsubara kanon", "kanon matsubara"],
+    "misaki": ["okusawa misaki", "misaki okusawa", "michelle"],
+    "aya": ["maruyama aya", "aya maruyama"],
+    "hina": ["hikawa hina", "hina hikawa"],
+    "chisato": ["shirasagi chisato", "chisato shirasagi"],
+    "maya": ["yamato maya", "maya yamato"],
+    "eve": ["wakamiya eve", "eve wakamiya"],
+    "yukina": ["minato yukina", "yukina minato"],
+    "sayo": ["hikawa sayo", "sayo hikawa"],
+    "lisa": ["imai lisa", "lisa imai"],
+    "ako": ["udagawa ako", "ako udagawa"],
+    "rinko": ["shirokane rinko", "rinko shirokane"],
+    "mashiro": ["kurata mashiro", "mashiro kurata"],
+    "touko": ["kirigaya touko", "touko kirigaya"],
+    "nanami": ["hiromachi nanami", "nanami hiromachi"],
+    "tsukushi": ["futaba tsukushi", "tsukushi futaba"],
+    "rui": ["yashio rui", "rui yashio"],
+    "layer": ["wakana rei", "rei wakana"],
+    "lock": ["asahi rokka", "rokka asahi", "rokka"],
+    "masking": ["sato masuki", "masuki sato"],
+    "pareo": ["nyubara reona", "reona nyubara", "reona"],
+    "chu2": ["chuchu", "chu chu", "tamade chiyu", "chiyu tamade", "chiyu"],
+    "tomori": ["takamatsu tomori", "tomori takamatsu"],
+    "anon": ["chihaya anon", "anon chihaya"],
+    "raana": ["kaname raana", "raana kaname", "rana", "kaname rana"],
+    "soyo": ["nagasaki soyo", "soyo nagasaki"],
+    "taki": ["shiina taki", "taki shiina"],
+}
+
+# Characters Bestdori knows but CHARACTER_MAP has no ID for yet.
+# They resolve as entities (with character_id None) so callers can still
+# recognize the name even though no card lookup is possible.
+EXTRA_CHARACTERS = {
+    "oblivionis": ["togawa sakiko", "sakiko togawa", "sakiko"],
+    "mortis": ["wakaba mutsumi", "mutsumi wakaba", "mutsumi"],
+    "doloris": ["misumi uika", "uika misumi", "uika"],
+    "timoris": ["yahata umiri", "umiri yahata", "umiri"],
+    "amoris": ["yutenji nyamu", "nyamu yutenji", "nyamu"],
+}
+
+# Extra spellings, keyed by the BAND_MAP name
+BAND_ALIASES = {
+    "poppinparty": ["ppp"],
+    "hellohappyworld": ["harohapi"],
+    "morfonica": ["monica"],
+    "ras": ["raisesuilen"],
+    "mygo": ["my go"],
+    "ave mujica": ["avemujica", "mujica"],
+}
+
+# Aliases shorter than this get no general edit-distance matching: one edit
+# away from a short alias is usually an ordinary word ("masuk" → masuki,
+# "player" → layer)
+FUZZY_MIN_LENGTH = 7
+# Short aliases of at least this length still tolerate a stretched ending,
+# the usual chat typo: one extra trailing letter or a repeated last letter
+# ("yukinaa", "rinkoooo")
+STRETCH_MIN_LENGTH = 4
+# Everyday chat words close to an alias; never fuzzy-matched
+COMMON_WORDS = frozenset({
+    "masuk", "masuknya", "player", "players", "later", "layar", "layers",
+    "asking", "making", "marking", "locks", "lisan", "mayan",
+})
+# Longest phrase (in words) considered as a name
+MAX_SPAN_WORDS = 3
+
+
+def normalize_name(text):
+    """Lowercase and strip punctuation: "Poppin'Party!" → "poppinparty", "MyGO!!!!!" → "mygo"."""
+    text = text.lower().replace("'", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _collapse_ending(text):
+    """Squeeze a repeated last letter to one: "rinkoooo" → "rinko"."""
+    stripped = text.rstrip(text[-1:])
+    return stripped + text[-1:] if stripped else text
+
+
+def _max_distance(alias):
+    if len(alias) < FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(alias) < 8 else 2
+
+
+class NameMatch:
+    """A resolved entity: kind is "character" or "band", name is the canonical map key."""
+
+    def __init__(self, kind, name, character_id, confidence, matched):
+        self.kind = kind
+        self.name = name
+        self.character_id = character_id
+        self.confidence = confidence
+        self.matched = matched
+
+    def __repr__(self):
+        return f"NameMatch({self.kind}={self.name!r}, confidence={self.confidence:.2f}, matched={self.matched!r})"
+
+
+class NameIndex:
+    """
+    Trigram index over every character/band alias.
+    Candidate aliases come from shared trigrams; the few candidates are then
+    scored with a bounded edit distance.
+    """
+
+    def __init__(self, character_map, band_map):
+        self.entries = []   # [(alias, kind, name, character_id)]
+        self.exact = {}     # {alias: entry index}
+        self.postings = {}  # {trigram: [entry index, ...]}
+        self.max_length = 0
+
+        for name, character_id in character_map.items():
+            self._add(name, "character", name, character_id)
+            for alias in CHARACTER_ALIASES.get(name, []):
+                self._add(alias, "character", name, character_id)
+        for name, aliases in EXTRA_CHARACTERS.items():
+            if name in character_map:
+                continue
+            self._add(name, "character", name, None)
+            for alias in aliases:
+                self._add(alias, "character", name, None)
+        for name in band_map:
+            self._add(name, "band", name, None)
+            for alias in BAND_ALIASES.get(name, []):
+                self._add(alias, "band", name, None)
+
+    def _add(self, alias, kind, name, character_id):
+        alias = normalize_name(alias)
+        if not alias or alias in self.exact:
+            return
+        index = len(self.entries)
+        self.entries.append((alias, kind, name, character_id))
+        self.exact[alias] = index
+        self.max_length = max(self.max_length, len(alias))
+        for gram in _trigrams(alias):
+            self.postings.setdefault(gram, []).append(index)
+
+    def _spans(self, words):
+        for size in range(MAX_SPAN_WORDS, 0, -1):
+            for start in range(len(words) - size + 1):
+                yield " ".join(words[start:start + size])
+
+    def _score(self, span):
+        """Best (confidence, entry index) for a single phrase, or None."""
+        index = self.exact.get(span)
+        if index is not None:
+            return 1.0, index
+        if len(span) > self.max_length + 2:
+            return None
+        if all(word in COMMON_WORDS for word in span.split()):
+            return None
+
+        # Short aliases: only a stretched ending, scored like a single edit
+        for stretched in (span[:-1], _collapse_ending(span)):
+            index = self.exact.get(stretched)
+            if index is not None and STRETCH_MIN_LENGTH <= len(stretched) < FUZZY_MIN_LENGTH:
+                return 1 - 1 / (len(stretched) + 1), index
+
+        counts = {}
+        for gram in _trigrams(span):
+            for candidate in self.postings.get(gram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+
+        best = None
+        for candidate, shared in counts.items():
+            alias = self.entries[candidate][0]
+            limit = _max_distance(alias)
+            # Each edit can destroy at most 3 trigrams
+            if not limit or shared < len(alias) - 3 * limit:
+                continue
+            distance = _edit_distance(span, alias, limit)
+            if distance > limit:
+                continue
+            confidence = 1 - distance / max(len(span), len(alias))
+            if best is None or confidence > best[0]:
+                best = (confidence, candidate)
+        return best
+
+    def resolve(self, text):
+        """
+        Best character/band mentioned in free text.
+        Longer phrases win ties, so "hikawa sayo" beats "hina"-style partial hits.
+        Returns a NameMatch or None.
+        """
+        words = normalize_name(text).split()
+        best = None
+        for span in self._spans(words):
+            scored = self._score(span)
+            if scored and (best is None or scored[0] > best[0]):
+                best = (scored[0], scored[1], span)
+                if scored[0] == 1.0 and " " in span:
+                    break
+
+        if best is None:
+            return None
+        confidence, index, span = best
+        _, kind, name, character_id = self.entries[index]
+        return NameMatch(kind, name, character_id, confidence, span)
@@ -0,0 +1,61 @@
+"""
+Bestdori Snapshot Storage
+Persists projected Bestdori datasets to disk for warm starts and offline fallback.
+"""
+
+import os
+import pickle
+import time
+
+SNAPSHOT_DIR = os.path.join("data", "bestdori")
+# Bump when the projected record layout changes so old files are ignored
+SNAPSHOT_VERSION = 2
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.snapshot")
+
+
+def save_snapshot(name, records, etag=None, last_modified=None):
+    """
+    Write a projected dataset to disk.
+    The file is written to a temp path and swapped in, so a crash never leaves a torn snapshot.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "etag": etag,
+        "last_modified": last_modified,
+        "records": records,
+    }
+
+    path = snapshot_path(name)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[Bestdori Error] save_snapshot {name}: {e}")
+
+
+def load_snapshot(name):
+    """
+    Read a projected dataset from disk.
+    Returns the snapshot dict (records, etag, last_modified, saved_at) or None.
+    """
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        print(f"[Bestdori Error] load_snapshot {name}: {e}")
+        return None
+
+    if payload.get("version") != SNAPSHOT_VERSION:
+        return None
+    return payload
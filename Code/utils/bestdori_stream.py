@@ -0,0 +1,108 @@
+"""
+Bestdori Streaming Parser
+Incrementally parses Bestdori all.5.json payloads ({id: record, ...}),
+projecting each record as soon as it is complete so the full document
+tree is never built.
+"""
+
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _COMMA, _DONE = range(6)
+
+
+class StreamingProjector:
+    """
+    Feed raw response chunks, get back {id: project(id, record)}.
+
+    Only the unparsed tail of the body and a single raw record are held in
+    memory at any time.
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.records = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self._key = None
+
+    def feed(self, chunk):
+        """Consume the next chunk of the response body (bytes)."""
+        self._buffer += self._text.decode(chunk)
+        self._parse(final=False)
+
+    def close(self):
+        """Finish parsing and return the projected records."""
+        self._buffer += self._text.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Truncated Bestdori payload")
+        return self.records
+
+    def _skip_whitespace(self, pos):
+        while pos < len(self._buffer) and self._buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def _parse(self, final):
+        pos = 0
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self._buffer) or self._state == _DONE:
+                break
+            char = self._buffer[pos]
+
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError(f"Expected '{{' at start of payload, got {char!r}")
+                pos += 1
+                self._state = _KEY
+
+            elif self._state == _KEY:
+                if char == "}":
+                    pos += 1
+                    self._state = _DONE
+                    continue
+                try:
+                    self._key, pos = _decoder.raw_decode(self._buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # Key split across chunks
+                self._state = _COLON
+
+            elif self._state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {self._key!r}, got {char!r}")
+                pos += 1
+                self._state = _VALUE
+
+            elif self._state == _VALUE:
+                try:
+                    value, end = _decoder.raw_decode(self._buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # Record split across chunks; wait for more data
+                if end == len(self._buffer) and char not in "{[\"" and not final:
+                    break  # A bare number may continue in the next chunk
+                pos = end
+                self.records[str(self._key)] = self.project(self._key, value)
+                self._state = _COMMA
+
+            elif self._state == _COMMA:
+                if char == ",":
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+                else:
+                    raise ValueError(f"Expected ',' or '}}' after record {self._key!r}, got {char!r}")
+                pos += 1
+
+        # Drop everything already consumed
+        self._buffer = self._buffer[pos:]
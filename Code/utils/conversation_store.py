@@ -0,0 +1,285 @@
+"""
+Conversation Store
+Per-user AI conversation memory with a global memory budget, LRU/idle
+eviction, budgeted prompt context and optional SQLite write-through.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Compact record roles
+ROLE_USER = 0
+ROLE_AI = 1
+ROLE_PREFIX = {ROLE_USER: "User", ROLE_AI: "AI"}
+
+# Approximate per-record overhead (tuple + str headers) used for the memory budget
+RECORD_OVERHEAD_BYTES = 100
+
+# Older turns are compacted to at most this many characters each
+SUMMARY_LINE_CHARS = 120
+
+# context() lines are joined into the prompt with a two-character "\\n";
+# each line's separator counts against the context budget
+SEPARATOR_CHARS = 2
+SUMMARY_PREFIX = "[Ringkasan percakapan sebelumnya: "
+SUMMARY_SUFFIX = "]"
+
+
+def compact_line(role, text):
+    """One-line, truncated form of a turn for the running summary."""
+    text = " ".join(text.split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    return f"{ROLE_PREFIX[role]}: {text}"
+
+
+class UserHistory:
+    """
+    Ring buffer of verbatim (role, text) records for one user, plus a running
+    summary of compacted older turns. Each record is compacted at most once.
+    """
+
+    __slots__ = ("records", "records_max", "summary", "summary_budget", "size", "last_active")
+
+    def __init__(self, max_turns, summary_budget):
+        self.records = deque()
+        self.records_max = max_turns
+        self.summary = deque()
+        self.summary_budget = summary_budget
+        self.size = 0
+        self.last_active = time.monotonic()
+
+    def append(self, role, text):
+        if len(self.records) >= self.records_max:
+            self.compact_oldest()
+        self.records.append((role, text))
+        self.size += len(text) + RECORD_OVERHEAD_BYTES
+        self.last_active = time.monotonic()
+
+    def compact_oldest(self):
+        """Move the oldest verbatim record into the summary, trimming the summary to its budget."""
+        role, text = self.records.popleft()
+        self.size -= len(text) + RECORD_OVERHEAD_BYTES
+        line = compact_line(role, text)
+        self.summary.append(line)
+        self.size += len(line) + RECORD_OVERHEAD_BYTES
+        summary_chars = sum(len(line) for line in self.summary)
+        while len(self.summary) > 1 and summary_chars > self.summary_budget:
+            dropped = self.summary.popleft()
+            summary_chars -= len(dropped)
+            self.size -= len(dropped) + RECORD_OVERHEAD_BYTES
+
+
+class ConversationStore:
+    """
+    {user_id: UserHistory} kept in LRU order.
+
+    - Each user keeps at most max_turns verbatim records; older ones are
+      compacted into a running summary of at most summary_budget characters.
+    - context() fits the summary and the newest turns into context_budget
+      characters and compacts the rest.
+    - When the total size passes memory_budget, least recently active users are evicted.
+    - Users idle for longer than idle_seconds are evicted on the next write.
+    - With db_path set, every record is written through to SQLite and evicted
+      users are reloaded from it on their next message.
+    """
+
+    def __init__(self, max_turns=10, memory_budget=2 * 1024 * 1024, idle_seconds=6 * 60 * 60, db_path=None,
+                 context_budget=3000, summary_budget=600):
+        self.max_turns = max_turns
+        self.context_budget = context_budget
+        self.summary_budget = summary_budget
+        self.memory_budget = memory_budget
+        self.idle_seconds = idle_seconds
+        self.users = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._open_db(db_path)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def __contains__(self, user_id):
+        return user_id in self.users
+
+    def __len__(self):
+        return len(self.users)
+
+    async def append(self, user_id, role, text):
+        """Add a record (ROLE_USER / ROLE_AI) to a user's history."""
+        history = await self._load(user_id)
+        self.size -= history.size
+        history.append(role, text)
+        self.size += history.size
+        self.users.move_to_end(user_id)
+
+        if self._db:
+            await asyncio.to_thread(self._db_append, user_id, role, text)
+        self._evict(keep=user_id)
+
+    async def history(self, user_id):
+        """A user's verbatim history as lines ("User: ...", "AI: ..."), oldest first."""
+        history = await self._load(user_id)
+        return [f"{ROLE_PREFIX[role]}: {text}" for role, text in history.records]
+
+    async def context(self, user_id):
+        """
+        Prompt lines for a user within context_budget characters (separators
+        included): a summary line for compacted turns, then the newest turns
+        verbatim, oldest first. Turns take priority; the summary keeps as many
+        of its newest entries as still fit, or is left out. A newest turn too
+        long for the budget on its own is truncated.
+        """
+        history = await self._load(user_id)
+        budget = self.context_budget
+        used = 0
+        keep = 0
+        for role, text in reversed(history.records):
+            cost = len(ROLE_PREFIX[role]) + 2 + len(text) + SEPARATOR_CHARS
+            if used + cost > budget:
+                break
+            used += cost
+            keep += 1
+        # The newest turn is always sent, truncated if it exceeds the budget by itself
+        oversized = not keep and bool(history.records)
+        if oversized:
+            keep = 1
+            used = budget
+
+        self.size -= history.size
+        while len(history.records) > keep:
+            history.compact_oldest()
+        self.size += history.size
+
+        lines = []
+        summary = self._fit_summary(history.summary, budget - used)
+        if summary:
+            lines.append(summary)
+        lines.extend(f"{ROLE_PREFIX[role]}: {text}" for role, text in history.records)
+        if oversized:
+            room = max(budget - SEPARATOR_CHARS - 1, 0)
+            lines[-1] = lines[-1][:room].rstrip() + "…"
+        return lines
+
+    @staticmethod
+    def _fit_summary(summary, room):
+        """The summary line with as many of the newest entries as fit in room characters, or None."""
+        length = len(SUMMARY_PREFIX) + len(SUMMARY_SUFFIX) + SEPARATOR_CHARS
+        entries = []
+        for entry in reversed(summary):
+            cost = len(entry) + (3 if entries else 0)  # " | " between entries
+            if length + cost > room:
+                break
+            length += cost
+            entries.append(entry)
+        if not entries:
+            return None
+        return SUMMARY_PREFIX + " | ".join(reversed(entries)) + SUMMARY_SUFFIX
+
+    async def clear(self, user_id):
+        """Forget a user's conversation (memory and database)."""
+        history = self.users.pop(user_id, None)
+        if history:
+            self.size -= history.size
+        if self._db:
+            await asyncio.to_thread(self._db_clear, user_id)
+
+    def stats(self):
+        return {
+            "users": len(self.users),
+            "bytes": self.size,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        if self._db:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # Memory management
+    # ------------------------------------------------------------------
+    async def _load(self, user_id):
+        history = self.users.get(user_id)
+        if history is None:
+            history = UserHistory(self.max_turns, self.summary_budget)
+            if self._db:
+                rows = await asyncio.to_thread(self._db_load, user_id)
+                # A concurrent message may have loaded (and extended) the history meanwhile
+                loaded = self.users.get(user_id)
+                if loaded is not None:
+                    return loaded
+                for role, text in rows:
+                    history.append(role, text)
+            self.users[user_id] = history
+            self.size += history.size
+        return history
+
+    def _evict(self, keep):
+        """Drop idle users, then least recently active users until under budget."""
+        cutoff = time.monotonic() - self.idle_seconds
+        while self.users:
+            user_id, history = next(iter(self.users.items()))
+            if user_id == keep:
+                break
+            if history.last_active >= cutoff and self.size <= self.memory_budget:
+                break
+            del self.users[user_id]
+            self.size -= history.size
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # SQLite write-through
+    # ------------------------------------------------------------------
+    def _open_db(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                user_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (user_id, seq)
+            )
+        """)
+        self._db.commit()
+
+    def _db_append(self, user_id, role, text):
+        with self._db_lock:
+            cursor = self._db.cursor()
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM conversations WHERE user_id = ?", (str(user_id),))
+            seq = cursor.fetchone()[0] + 1
+            cursor.execute(
+                "INSERT INTO conversations (user_id, seq, role, text) VALUES (?, ?, ?, ?)",
+                (str(user_id), seq, role, text)
+            )
+            # Keep only the newest max_turns rows per user
+            cursor.execute(
+                "DELETE FROM conversations WHERE user_id = ? AND seq <= ?",
+                (str(user_id), seq - self.max_turns)
+            )
+            self._db.commit()
+
+    def _db_load(self, user_id):
+        with self._db_lock:
+            cursor = self._db.execute(
+                "SELECT role, text FROM conversations WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
+                (str(user_id), self.max_turns)
+            )
+            return list(reversed(cursor.fetchall()))
+
+    def _db_clear(self, user_id):
+        with self._db_lock:
+            self._db.execute("DELETE FROM conversations WHERE user_id = ?", (str(user_id),))
+            self._db.commit()
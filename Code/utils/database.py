@@ -1,81 +1,270 @@
 """
 Database Utility for Leveling System
-Uses SQLite to store user XP and levels.
+Uses SQLite to store user XP and levels, through one long-lived connection
+that lives on a dedicated worker thread; every query is awaitable.
 """
 
-import sqlite3
+import asyncio
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
 DB_DIR = "data"
 DB_FILE = os.path.join(DB_DIR, "leveling.db")
 
-def initialize_database():
-    """Initialize the database and create tables if they don't exist."""
-    if not os.path.exists(DB_DIR):
-        os.makedirs(DB_DIR)
-        
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    # Create Users Table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT PRIMARY KEY,
-            xp INTEGER DEFAULT 0,
-            level INTEGER DEFAULT 0
+# Applied once when the connection opens. WAL lets reads proceed during writes
+# and, with synchronous=NORMAL, commits no longer fsync on every transaction.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",  # 8 MB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Compiled statements kept per connection (sqlite3 reuses them by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+
+# ============================================================================
+# QUERIES (run on the database thread with its connection)
+# ============================================================================
+def _initialize(conn):
+    with conn:
+        # XP per (guild, user). WITHOUT ROWID stores rows in primary key order,
+        # so a member lookup is a single B-tree search.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS guild_users (
+                guild_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                xp INTEGER DEFAULT 0,
+                level INTEGER DEFAULT 0,
+                last_active INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID
+        """)
+
+        # Unix time of the member's last XP-earning message (0 = unknown), for XP decay
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(guild_users)")}
+        if "last_active" not in columns:
+            conn.execute("ALTER TABLE guild_users ADD COLUMN last_active INTEGER NOT NULL DEFAULT 0")
+
+        # Covering index: per-guild leaderboards are answered from the index alone
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_guild_users_xp
+            ON guild_users (guild_id, xp DESC, user_id, level)
+        """)
+
+        # Create Role Rewards Table (Optional, for future extensibility)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS role_rewards (
+                level INTEGER PRIMARY KEY,
+                role_id TEXT NOT NULL
+            )
+        """)
+
+
+def _get_user_data(conn, guild_id, user_id, legacy_guild_id=None):
+    key = (str(guild_id), str(user_id))
+    data = conn.execute("SELECT xp, level, last_active FROM guild_users WHERE guild_id = ? AND user_id = ?", key).fetchone()
+    if not data:
+        with conn:
+            if legacy_guild_id is not None and str(guild_id) == str(legacy_guild_id):
+                # Migration in progress: bring this user's global row over first
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO guild_users (guild_id, user_id, xp, level)
+                    SELECT ?, user_id, xp, level FROM users WHERE user_id = ?
+                    """,
+                    key
+                )
+            # Create new user entry (no-op if the legacy row was copied)
+            conn.execute("INSERT OR IGNORE INTO guild_users (guild_id, user_id, xp, level) VALUES (?, ?, 0, 0)", key)
+        data = conn.execute("SELECT xp, level, last_active FROM guild_users WHERE guild_id = ? AND user_id = ?", key).fetchone()
+    return {"xp": data[0] or 0, "level": data[1] or 0, "last_active": data[2] or 0}
+
+
+def _update_user_xp(conn, guild_id, user_id, new_xp, new_level):
+    with conn:
+        conn.execute(
+            "UPDATE guild_users SET xp = ?, level = ? WHERE guild_id = ? AND user_id = ?",
+            (new_xp, new_level, str(guild_id), str(user_id))
         )
-    """)
-    
-    # Create Role Rewards Table (Optional, for future extensibility)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS role_rewards (
-            level INTEGER PRIMARY KEY,
-            role_id TEXT NOT NULL
+
+
+def _update_users_xp(conn, rows):
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO guild_users (guild_id, user_id, xp, level, last_active) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE
+            SET xp = excluded.xp, level = excluded.level, last_active = excluded.last_active
+            """,
+            [(str(guild_id), str(user_id), xp, level, last_active) for guild_id, user_id, xp, level, last_active in rows]
         )
-    """)
-    
-    conn.commit()
-    conn.close()
-    print(f"✅ Database initialized at {DB_FILE}")
-
-def get_connection():
-    """Get a connection to the SQLite database."""
-    return sqlite3.connect(DB_FILE)
-
-def get_user_data(user_id):
-    """Get user data (xp, level) or create default if not exists."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT xp, level FROM users WHERE user_id = ?", (str(user_id),))
-    data = cursor.fetchone()
-    
-    if not data:
-        # Create new user entry
-        cursor.execute("INSERT INTO users (user_id, xp, level) VALUES (?, 0, 0)", (str(user_id),))
-        conn.commit()
-        data = (0, 0)
-        
-    conn.close()
-    return {"xp": data[0], "level": data[1]}
-
-def update_user_xp(user_id, new_xp, new_level):
-    """Update user's XP and Level."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("UPDATE users SET xp = ?, level = ? WHERE user_id = ?", (new_xp, new_level, str(user_id)))
-    
-    conn.commit()
-    conn.close()
-
-def get_top_users(limit=10):
-    """Get top users by XP."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT user_id, xp, level FROM users ORDER BY xp DESC LIMIT ?", (limit,))
-    data = cursor.fetchall()
-    
-    conn.close()
-    return data
+
+
+def _get_top_users(conn, guild_id, limit):
+    return conn.execute(
+        "SELECT user_id, xp, level FROM guild_users WHERE guild_id = ? ORDER BY xp DESC LIMIT ?",
+        (str(guild_id), limit)
+    ).fetchall()
+
+
+def _get_guild_users(conn, guild_id):
+    return conn.execute(
+        "SELECT user_id, xp, level FROM guild_users WHERE guild_id = ? AND xp > 0", (str(guild_id),)
+    ).fetchall()
+
+
+def _get_all_users(conn):
+    return conn.execute("SELECT guild_id, user_id, xp, level FROM guild_users WHERE xp > 0").fetchall()
+
+
+# ----------------------------------------------------------------------------
+# Migration from the pre-guild `users` table (user_id PRIMARY KEY, global XP)
+# ----------------------------------------------------------------------------
+LEGACY_TABLE = "users"
+LEGACY_BACKUP_TABLE = "users_legacy"
+
+
+def _table_exists(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _has_legacy_table(conn):
+    return _table_exists(conn, LEGACY_TABLE)
+
+
+def _migrate_legacy_batch(conn, guild_id, after_rowid, batch_size):
+    """Copy the next batch of global rows into guild_id. Returns (last rowid, rows read)."""
+    rows = conn.execute(
+        f"SELECT rowid, user_id, xp, level FROM {LEGACY_TABLE} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+        (after_rowid, batch_size)
+    ).fetchall()
+    if not rows:
+        return after_rowid, 0
+    with conn:
+        # Rows already migrated on first read (and possibly updated since) are left alone
+        conn.executemany(
+            "INSERT OR IGNORE INTO guild_users (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)",
+            [(str(guild_id), user_id, xp or 0, level or 0) for _, user_id, xp, level in rows]
+        )
+    return rows[-1][0], len(rows)
+
+
+def _finish_legacy_migration(conn):
+    """Retire the global table, keeping it as a backup the first time."""
+    with conn:
+        if _table_exists(conn, LEGACY_BACKUP_TABLE):
+            conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+        else:
+            conn.execute(f"ALTER TABLE {LEGACY_TABLE} RENAME TO {LEGACY_BACKUP_TABLE}")
+
+
+# ============================================================================
+# DATABASE
+# ============================================================================
+class Database:
+    """
+    One SQLite connection owned by a single worker thread.
+    Calls are queued to that thread, so the event loop never blocks on disk
+    and the connection (and its statement cache) is reused for every query.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._executor = None
+        self._conn = None  # Only touched on the worker thread
+        self.migrating_guild_id = None  # Set while global XP is being moved into a guild
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _call(self, query, args):
+        if self._conn is None:
+            self._conn = self._connect()
+        return query(self._conn, *args)
+
+    async def run(self, query, *args):
+        """Run query(conn, *args) on the database thread and return its result."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, query, args)
+
+    async def close(self):
+        """Close the connection and stop the worker thread."""
+        if self._executor is None:
+            return
+
+        def close_connection(conn):
+            conn.close()
+            self._conn = None
+
+        if self._conn is not None:
+            await self.run(close_connection)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def initialize(self):
+        """Create tables if they don't exist."""
+        await self.run(_initialize)
+        print(f"✅ Database initialized at {self.path}")
+
+    async def get_user_data(self, guild_id, user_id):
+        """Get a member's data {"xp", "level", "last_active"}, creating a default row if they are new."""
+        return await self.run(_get_user_data, guild_id, user_id, self.migrating_guild_id)
+
+    async def update_user_xp(self, guild_id, user_id, new_xp, new_level):
+        """Update a member's XP and Level."""
+        await self.run(_update_user_xp, guild_id, user_id, new_xp, new_level)
+
+    async def update_users_xp(self, rows):
+        """Write many (guild_id, user_id, xp, level, last_active) rows in one transaction."""
+        await self.run(_update_users_xp, rows)
+
+    async def get_top_users(self, guild_id, limit=10):
+        """Get a guild's top users by XP as (user_id, xp, level) tuples."""
+        return await self.run(_get_top_users, guild_id, limit)
+
+    async def get_guild_users(self, guild_id):
+        """Every member of a guild with XP as (user_id, xp, level) tuples."""
+        return await self.run(_get_guild_users, guild_id)
+
+    async def get_all_users(self):
+        """Every member with XP as (guild_id, user_id, xp, level) tuples (used to build the in-memory leaderboards)."""
+        return await self.run(_get_all_users)
+
+    async def has_legacy_table(self):
+        """True if the pre-guild global `users` table still needs migrating."""
+        return await self.run(_has_legacy_table)
+
+    async def migrate_legacy(self, guild_id, batch_size=500):
+        """
+        Move global XP into guild_id while the bot keeps running: rows are copied
+        in small transactions, and members who show up meanwhile are copied on
+        first read. Returns the number of legacy rows read.
+        """
+        self.migrating_guild_id = guild_id
+        try:
+            after_rowid, total = 0, 0
+            while True:
+                after_rowid, count = await self.run(_migrate_legacy_batch, guild_id, after_rowid, batch_size)
+                if not count:
+                    break
+                total += count
+        finally:
+            # Cleared before the table is retired: reads queued after this point
+            # run after the rename and must not look for the old table
+            self.migrating_guild_id = None
+        await self.run(_finish_legacy_migration)
+        return total
+
+
+# Shared instance for the leveling system
+db = Database()
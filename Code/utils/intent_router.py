@@ -0,0 +1,97 @@
+"""
+Intent Router
+Extracts the Bestdori intent (event / gacha / card), entity, rarity and
+card type from a chat message with one pass of a regex compiled at load time.
+"""
+
+import re
+
+# Intent keywords (plain substrings, as the AI cog has always matched them)
+EVENT_WORDS = ("event",)
+EVENT_WHEN_WORDS = ("jp", "jepang", "now", "sekarang")
+GACHA_WORDS = ("gacha",)
+CARD_WORDS = ("kartu", "card")
+# Card type keywords; dream/kira only count together with "fest"
+TYPE_WORDS = ("dream", "kira", "fest", "limited", "birthday")
+
+INTENT_EVENT = "event"
+INTENT_GACHA = "gacha"
+INTENT_CARD = "card"
+
+
+class Intent:
+    """Result of routing one message. Fields are None when not present."""
+
+    def __init__(self, intent=None, band=None, character=None, rarity=None, card_type=None):
+        self.intent = intent
+        self.band = band
+        self.character = character
+        self.rarity = rarity
+        self.card_type = card_type
+
+    def __repr__(self):
+        return (f"Intent({self.intent!r}, band={self.band!r}, character={self.character!r}, "
+                f"rarity={self.rarity!r}, card_type={self.card_type!r})")
+
+
+class IntentRouter:
+    """
+    All entity names and keywords compiled into a single alternation.
+    Entities are word-bounded (so "eve" never matches inside "event") and
+    ordered longest first (so "raise a suilen" wins over shorter names).
+    """
+
+    def __init__(self, character_map, band_map):
+        self.bands = set(band_map)
+        self.characters = set(character_map)
+        entities = sorted(self.bands | self.characters, key=len, reverse=True)
+        keywords = sorted(set(EVENT_WORDS + EVENT_WHEN_WORDS + GACHA_WORDS + CARD_WORDS + TYPE_WORDS),
+                          key=len, reverse=True)
+
+        self.pattern = re.compile(
+            r"(?P<rarity>\d)\s*(?:star|bintang|-star)"
+            r"|\b(?P<entity>" + "|".join(map(re.escape, entities)) + r")\b"
+            r"|(?P<keyword>" + "|".join(map(re.escape, keywords)) + r")"
+        )
+
+    def route(self, text):
+        """Route a message (any case). Returns an Intent."""
+        rarity = None
+        band = None
+        character = None
+        keywords = set()
+
+        for match in self.pattern.finditer(text.lower()):
+            kind = match.lastgroup
+            if kind == "keyword":
+                keywords.add(match.group("keyword"))
+            elif kind == "entity":
+                name = match.group("entity")
+                # Bands take precedence over individual characters
+                if name in self.bands:
+                    band = band or name
+                else:
+                    character = character or name
+            elif rarity is None:
+                rarity = int(match.group("rarity"))
+
+        if "event" in keywords and keywords.intersection(EVENT_WHEN_WORDS):
+            intent = INTENT_EVENT
+        elif keywords.intersection(GACHA_WORDS):
+            intent = INTENT_GACHA
+        elif keywords.intersection(CARD_WORDS):
+            intent = INTENT_CARD
+        else:
+            intent = None
+
+        card_type = None
+        if "dream" in keywords and "fest" in keywords:
+            card_type = "dream_fes"
+        elif "kira" in keywords and "fest" in keywords:
+            card_type = "kirafes"
+        elif "limited" in keywords:
+            card_type = "limited"
+        elif "birthday" in keywords:
+            card_type = "birthday"
+
+        return Intent(intent, band, None if band else character, rarity, card_type)
@@ -0,0 +1,82 @@
+"""
+Leaderboard
+In-memory per-guild XP rankings kept in sync with XP writes, so leaderboard
+pages and "what rank am I?" never scan the XP table.
+"""
+
+from bisect import bisect_left, insort
+
+
+class Leaderboard:
+    """
+    Users ordered by XP (highest first) as a sorted list of (-xp, user_id) keys.
+    Position lookups are a binary search; ties share a rank ("1, 2, 2, 4").
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.users = {}  # {user_id: (xp, level)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def load(self, rows):
+        """Replace the contents with (user_id, xp, level) rows."""
+        self.users = {int(user_id): (xp or 0, level or 0) for user_id, xp, level in rows}
+        self.keys = sorted((-xp, user_id) for user_id, (xp, _) in self.users.items())
+
+    def update(self, user_id, xp, level):
+        user_id = int(user_id)
+        old = self.users.get(user_id)
+        if old is not None and old[0] != xp:
+            index = bisect_left(self.keys, (-old[0], user_id))
+            del self.keys[index]
+        if old is None or old[0] != xp:
+            insort(self.keys, (-xp, user_id))
+        self.users[user_id] = (xp, level)
+
+    def rank(self, user_id):
+        """1-based position of a user, or None if they have no XP record."""
+        entry = self.users.get(int(user_id))
+        if entry is None:
+            return None
+        # Everyone with strictly more XP sorts before (-xp,)
+        return bisect_left(self.keys, (-entry[0],)) + 1
+
+    def page(self, page=1, per_page=10):
+        """(rank, user_id, xp, level) rows for a 1-based page."""
+        start = (page - 1) * per_page
+        rows = []
+        for neg_xp, user_id in self.keys[start:start + per_page]:
+            xp, level = self.users[user_id]
+            rows.append((bisect_left(self.keys, (neg_xp,)) + 1, user_id, xp, level))
+        return rows
+
+    def page_count(self, per_page=10):
+        return max(1, -(-len(self.keys) // per_page))
+
+
+class GuildLeaderboards:
+    """{guild_id: Leaderboard}, created on first use."""
+
+    def __init__(self):
+        self.guilds = {}
+
+    def get(self, guild_id):
+        guild_id = int(guild_id)
+        board = self.guilds.get(guild_id)
+        if board is None:
+            board = self.guilds[guild_id] = Leaderboard()
+        return board
+
+    def load(self, rows):
+        """Replace every guild's ranking with (guild_id, user_id, xp, level) rows."""
+        grouped = {}
+        for guild_id, user_id, xp, level in rows:
+            grouped.setdefault(int(guild_id), []).append((user_id, xp, level))
+        self.guilds = {}
+        for guild_id, guild_rows in grouped.items():
+            self.get(guild_id).load(guild_rows)
+
+    def update(self, guild_id, user_id, xp, level):
+        self.get(guild_id).update(user_id, xp, level)
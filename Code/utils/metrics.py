@@ -0,0 +1,69 @@
+"""
+Metrics
+In-process counters and rolling samples (latency, sizes) for runtime stats.
+"""
+
+from collections import deque
+
+# Samples kept per series for percentiles
+SAMPLE_WINDOW = 1000
+
+
+class Series:
+    """Rolling window of numeric samples plus lifetime count/total."""
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, window=SAMPLE_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self.samples) if self.samples else 0.0,
+        }
+
+
+class Metrics:
+    """Named counters and sample series, created on first use."""
+
+    def __init__(self):
+        self.counters = {}
+        self.series = {}
+
+    def incr(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = Series()
+        series.add(value)
+
+    def counter(self, name):
+        return self.counters.get(name, 0)
+
+    def summary(self, name):
+        series = self.series.get(name)
+        return series.summary() if series else Series().summary()
+
+
+# Shared instance
+metrics = Metrics()
@@ -0,0 +1,71 @@
+"""
+User Name Resolver
+Display names for lists of user IDs: guild member cache and the bot's user
+cache first, then a TTL cache, and only the remaining misses are fetched
+from Discord, concurrently with bounded parallelism.
+"""
+
+import asyncio
+
+import discord
+
+from utils.ttl_cache import TTLCache
+
+# Parallel fetch_user calls per resolve()
+FETCH_CONCURRENCY = 5
+# Fetched names are reused for this long (seconds)
+NAME_TTL = 60 * 60
+
+UNKNOWN_USER = "Unknown User"
+
+
+class NameResolver:
+    """{user_id: display name} lookups for leaderboards and similar listings."""
+
+    def __init__(self, bot, ttl=NAME_TTL, concurrency=FETCH_CONCURRENCY, maxsize=5000):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.fetches = 0
+
+    def cached_name(self, user_id, guild=None):
+        """Name from local caches only, or None if Discord would have to be asked."""
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member.display_name
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user.display_name
+        return self.cache.get(user_id)
+
+    async def _fetch(self, semaphore, user_id):
+        async with semaphore:
+            self.fetches += 1
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                self.cache.set(user_id, UNKNOWN_USER)
+                return UNKNOWN_USER
+            except Exception as e:
+                print(f"[Leveling] Failed to fetch user {user_id}: {e}")
+                return UNKNOWN_USER
+        self.cache.set(user_id, user.display_name)
+        return user.display_name
+
+    async def resolve(self, user_ids, guild=None):
+        """Display names for user_ids (ints) as {user_id: name}."""
+        names = {}
+        misses = []
+        for user_id in user_ids:
+            name = self.cached_name(user_id, guild)
+            if name is None:
+                misses.append(user_id)
+            else:
+                names[user_id] = name
+
+        if misses:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            fetched = await asyncio.gather(*(self._fetch(semaphore, user_id) for user_id in misses))
+            names.update(zip(misses, fetched))
+        return names
@@ -0,0 +1,75 @@
+"""
+Reply Renderer
+Sends an AI response (text, optional image) to Discord in as few messages as
+possible: the image embed rides along with the text, and long text is split
+only as often as the 2000-character limit requires.
+"""
+
+import math
+
+import discord
+
+# Discord's per-message content limit
+MESSAGE_LIMIT = 2000
+
+
+def split_text(text, limit=MESSAGE_LIMIT):
+    """
+    Split text into the minimum number of chunks of at most `limit` characters.
+    Breaks at newlines or spaces when that doesn't cost an extra message.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    chunks = []
+    rest = text
+    while len(rest) > limit:
+        # Prefer a line break in the second half of the chunk, then a space
+        cut = rest.rfind("\n", limit // 2, limit + 1)
+        if cut < 0:
+            cut = rest.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            chunks.append(rest[:limit])
+            rest = rest[limit:]
+        else:
+            chunks.append(rest[:cut])
+            rest = rest[cut + 1:]
+    if rest:
+        chunks.append(rest)
+
+    minimum = math.ceil(len(text) / limit)
+    if len(chunks) > minimum:
+        # Word boundaries would cost an extra message: fill every chunk instead
+        chunks = [text[i:i + limit] for i in range(0, len(text), limit)]
+    return chunks
+
+
+def image_embed(url):
+    embed = discord.Embed(color=discord.Color.blue())
+    embed.set_image(url=url)
+    return embed
+
+
+async def send_ai_reply(target, response):
+    """
+    Reply to `target` (a discord.Message or commands.Context) with an AI response:
+    a plain string, or a {"text", "image"} dict from AI.get_ai_response.
+    The first chunk is a reply; the image embed is attached to the last chunk.
+    """
+    if not response:
+        return
+
+    if isinstance(response, dict):
+        text = response.get("text") or ""
+        image = response.get("image")
+    else:
+        text, image = response, None
+
+    embed = image_embed(image) if image else None
+    chunks = split_text(text) if text else [None]
+    for i, chunk in enumerate(chunks):
+        kwargs = {"embed": embed} if embed and i == len(chunks) - 1 else {}
+        if i == 0:
+            await target.reply(chunk, **kwargs)
+        else:
+            await target.channel.send(chunk, **kwargs)
@@ -0,0 +1,54 @@
+"""
+Single Flight
+Coalesces concurrent identical async calls: callers with the same key share
+one in-flight task instead of each starting their own.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """
+    {key: asyncio.Task} for calls currently in flight.
+    A key is forgotten as soon as its task finishes, so results are never cached here.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.started = 0
+        self.shared = 0
+
+    def __contains__(self, key):
+        return key in self.calls
+
+    def start(self, key, factory):
+        """
+        Return the in-flight task for key, or start factory() as a new one.
+        Useful for fire-and-forget work that later callers may still want to await.
+        """
+        task = self.calls.get(key)
+        if task is not None and not task.done():
+            self.shared += 1
+            return task
+
+        task = asyncio.ensure_future(factory())
+        self.calls[key] = task
+        self.started += 1
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    async def do(self, key, factory):
+        """
+        Await factory() once per key across concurrent callers.
+        A caller being cancelled does not cancel the shared task for the others.
+        """
+        return await asyncio.shield(self.start(key, factory))
+
+    def _forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def cancel_all(self):
+        for task in self.calls.values():
+            task.cancel()
+        self.calls.clear()
@@ -0,0 +1,129 @@
+"""
+XP Write-Behind Buffer
+Keeps XP and levels in memory so message handling never waits on SQLite;
+dirty rows are flushed in one batched transaction every few seconds.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+from utils.database import db
+from utils.metrics import metrics
+
+# Seconds between background flushes
+FLUSH_INTERVAL = 5
+# Flushed rows untouched for this long are dropped (re-read on the member's next message)
+ROW_IDLE_SECONDS = 10 * 60
+
+
+class XPBuffer:
+    """
+    {(guild_id, user_id): [xp, level, last_active, touched]} for recently active
+    members in least-recently-used order, plus the set of keys changed since the
+    last flush. Reads and writes are dict operations; a member's row is read from
+    the database when first seen, and dropped again once it is flushed and idle
+    for idle_seconds, so memory follows active users. Every write is also applied
+    to the optional GuildLeaderboards.
+    """
+
+    def __init__(self, interval=FLUSH_INTERVAL, rankings=None, idle_seconds=ROW_IDLE_SECONDS):
+        self.interval = interval
+        self.rankings = rankings
+        self.idle_seconds = idle_seconds
+        self.rows = OrderedDict()
+        self.evictions = 0
+        self.dirty = set()
+        self._flusher = None
+        self._flush_lock = asyncio.Lock()
+
+    async def get(self, guild_id, user_id):
+        """Current {"xp", "level"} for a member, including unflushed changes."""
+        key = (guild_id, user_id)
+        row = self.rows.get(key)
+        if row is None:
+            data = await db.get_user_data(guild_id, user_id)
+            # Another message may have populated the row while we were reading
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = [data["xp"], data["level"], data["last_active"], 0]
+        self._touch(key, row)
+        return {"xp": row[0], "level": row[1]}
+
+    def set(self, guild_id, user_id, xp, level, active=True):
+        """
+        Record a member's new XP and level; written to the database on the next flush.
+        active=False (admin edits) leaves their last-activity time unchanged.
+        """
+        key = (guild_id, user_id)
+        old = self.rows.get(key)
+        last_active = int(time.time()) if active or old is None else old[2]
+        row = self.rows[key] = [xp, level, last_active, 0]
+        self._touch(key, row)
+        self.dirty.add(key)
+        if self.rankings is not None:
+            self.rankings.update(guild_id, user_id, xp, level)
+
+    async def flush(self):
+        """Write every dirty row in one transaction. Returns the number of rows written."""
+        async with self._flush_lock:
+            if not self.dirty:
+                return 0
+            keys, self.dirty = self.dirty, set()
+            batch = [(*key, *self.rows[key][:3]) for key in keys]
+
+            start = time.perf_counter()
+            try:
+                await db.update_users_xp(batch)
+            except Exception as e:
+                print(f"[Leveling] XP flush failed ({len(batch)} rows): {e}")
+                self.dirty |= keys  # Retry on the next flush
+                return 0
+
+            metrics.observe("leveling.flush_ms", (time.perf_counter() - start) * 1000)
+            metrics.observe("leveling.flush_rows", len(batch))
+            return len(batch)
+
+    def _touch(self, key, row):
+        row[3] = time.monotonic()
+        self.rows.move_to_end(key)
+
+    def evict_idle(self):
+        """Drop clean rows idle for longer than idle_seconds (oldest first, so this stops at the first recent row)."""
+        cutoff = time.monotonic() - self.idle_seconds
+        expired = []
+        for key, row in self.rows.items():
+            if row[3] > cutoff:
+                break
+            if key not in self.dirty:
+                expired.append(key)
+        for key in expired:
+            del self.rows[key]
+        self.evictions += len(expired)
+
+    def forget_guild(self, guild_id, dirty=False):
+        """
+        Drop a guild's clean rows so they are re-read after the database was
+        changed underneath. dirty=True also discards its unflushed writes.
+        """
+        for key in [key for key in self.rows if key[0] == guild_id and (dirty or key not in self.dirty)]:
+            del self.rows[key]
+            self.dirty.discard(key)
+
+    def start(self):
+        """Start the periodic background flush (idempotent)."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+            self.evict_idle()
+
+    async def close(self):
+        """Stop the background flush and write whatever is still pending."""
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
@@ -0,0 +1,183 @@
+"""
+Bulk XP Operations
+Vectorized (NumPy) admin operations over one guild's XP rows: level
+recalculation, inactivity decay and CSV/Parquet import/export.
+
+The operations take a sqlite3 connection and are meant to run on the
+database thread via Database.run(); each writes back in one transaction.
+"""
+
+import csv
+import io
+import math
+
+import numpy as np
+
+# Total XP needed for level L is XP_LEVEL_FACTOR * L^2
+XP_LEVEL_FACTOR = 100
+
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_COLUMNS = ["user_id", "xp", "level", "last_active"]
+
+
+def xp_for_level(level):
+    """Total XP needed to reach a level."""
+    return XP_LEVEL_FACTOR * level ** 2
+
+
+def level_for_xp(xp):
+    """Level reached with a given total XP (closed form of xp_for_level)."""
+    return math.isqrt(max(int(xp), 0) // XP_LEVEL_FACTOR)
+
+
+def levels_for_xp(xp):
+    """level_for_xp over an int64 array."""
+    units = np.maximum(xp, 0) // XP_LEVEL_FACTOR
+    levels = np.floor(np.sqrt(units)).astype(np.int64)
+    # sqrt in float64 can land one off near large perfect squares
+    levels -= (levels * levels > units)
+    levels += ((levels + 1) * (levels + 1) <= units)
+    return levels
+
+
+# ============================================================================
+# LOAD / WRITE BACK
+# ============================================================================
+def _load(conn, guild_id):
+    """A guild's rows as (user_ids list, xp, level, last_active int64 arrays)."""
+    rows = conn.execute(
+        """
+        SELECT user_id, COALESCE(xp, 0), COALESCE(level, 0), last_active
+        FROM guild_users WHERE guild_id = ?
+        """,
+        (str(guild_id),)
+    ).fetchall()
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return [], empty, empty.copy(), empty.copy()
+
+    user_ids = [row[0] for row in rows]
+    values = np.array([row[1:] for row in rows], dtype=np.int64)
+    return user_ids, values[:, 0].copy(), values[:, 1].copy(), values[:, 2].copy()
+
+
+def _write_back(conn, guild_id, user_ids, xp, level, changed):
+    """Write the changed rows in one transaction. Returns the number written."""
+    index = np.flatnonzero(changed)
+    if not len(index):
+        return 0
+    guild_id = str(guild_id)
+    with conn:
+        conn.executemany(
+            "UPDATE guild_users SET xp = ?, level = ? WHERE guild_id = ? AND user_id = ?",
+            zip(xp[index].tolist(), level[index].tolist(), [guild_id] * len(index), [user_ids[i] for i in index])
+        )
+    return len(index)
+
+
+# ============================================================================
+# OPERATIONS
+# ============================================================================
+def recalculate_levels(conn, guild_id):
+    """Set every level from XP with the closed-form formula. Returns (changed, total)."""
+    user_ids, xp, level, _ = _load(conn, guild_id)
+    correct = levels_for_xp(xp)
+    changed = correct != level
+    return _write_back(conn, guild_id, user_ids, xp, correct, changed), len(user_ids)
+
+
+def decay_xp(conn, guild_id, percent, inactive_seconds, now):
+    """
+    Remove `percent`% of XP from members inactive for at least `inactive_seconds`,
+    recomputing their levels. Members with no recorded activity are skipped.
+    Returns (changed, total).
+    """
+    user_ids, xp, level, last_active = _load(conn, guild_id)
+    inactive = (last_active > 0) & (last_active <= now - inactive_seconds) & (xp > 0)
+    factor = max(0.0, 1.0 - percent / 100.0)
+
+    new_xp = xp.copy()
+    new_xp[inactive] = np.floor(xp[inactive] * factor).astype(np.int64)
+    new_level = level.copy()
+    new_level[inactive] = levels_for_xp(new_xp[inactive])
+
+    changed = (new_xp != xp) | (new_level != level)
+    return _write_back(conn, guild_id, user_ids, new_xp, new_level, changed), len(user_ids)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet needs pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+
+def export_xp(conn, guild_id, fmt="csv"):
+    """A guild's XP table as CSV or Parquet bytes (Parquet needs pyarrow)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (expected one of: {', '.join(EXPORT_FORMATS)})")
+    user_ids, xp, level, last_active = _load(conn, guild_id)
+
+    if fmt == "csv":
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(zip(user_ids, xp.tolist(), level.tolist(), last_active.tolist()))
+        return text.getvalue().encode("utf-8")
+
+    pa, pq = _require_pyarrow()
+    table = pa.table({"user_id": user_ids, "xp": xp, "level": level, "last_active": last_active})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def _read_rows(data, fmt):
+    """(user_ids, xp int64 array) from CSV or Parquet bytes."""
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+        missing = {"user_id", "xp"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+        rows = [(row["user_id"].strip(), row["xp"].strip()) for row in reader if row["user_id"] and row["xp"]]
+        user_ids = [user_id for user_id, _ in rows]
+        xp = np.array([value for _, value in rows], dtype=np.float64) if rows else np.zeros(0)
+    else:
+        _, pq = _require_pyarrow()
+        table = pq.read_table(io.BytesIO(data))
+        missing = {"user_id", "xp"} - set(table.column_names)
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+        user_ids = [str(user_id) for user_id in table.column("user_id").to_pylist()]
+        xp = np.array(table.column("xp").to_pylist(), dtype=np.float64)
+
+    if any(not user_id.isdigit() for user_id in user_ids):
+        raise ValueError("user_id must be a Discord user ID")
+    keep = ~np.isnan(xp)
+    user_ids = [user_id for user_id, ok in zip(user_ids, keep.tolist()) if ok]
+    return user_ids, np.maximum(xp[keep], 0).astype(np.int64)
+
+
+def import_xp(conn, guild_id, data, fmt="csv"):
+    """
+    Load user_id/xp rows (CSV or Parquet bytes) into a guild, replacing those
+    members' XP. Levels are recomputed from XP; any level column is ignored.
+    Returns the number of rows imported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (expected one of: {', '.join(EXPORT_FORMATS)})")
+    user_ids, xp = _read_rows(data, fmt)
+    level = levels_for_xp(xp)
+
+    guild_id = str(guild_id)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO guild_users (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET xp = excluded.xp, level = excluded.level
+            """,
+            zip([guild_id] * len(user_ids), user_ids, xp.tolist(), level.tolist())
+        )
+    return len(user_ids)